@@ -0,0 +1,114 @@
+"""
+Deterministic corpus of LLM-style outputs for the benchmarks.
+
+Outputs mimic what the bundled templates ask for: lists of small single-quoted
+Python literals (classification, NER), nested JSON dicts, and the same wrapped
+in prose. Every kind is produced complete and truncated at a random offset.
+"""
+import json
+import random
+from typing import Dict, List
+
+
+LABELS = ["World", "Sports", "Business", "Sci/Tech"]
+ENTITY_TYPES = ["ORGANIZATION", "LOCATION", "DATE", "PERSON"]
+WORDS = (
+    "the federal bureau of investigation has been ordered to track down as many as "
+    "three thousand people whose visas have expired the justice department said"
+).split()
+
+SIZES = {"small": 4, "medium": 64, "large": 1024}
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def ner_output(rng: random.Random, n_items: int) -> str:
+    """
+    A single-quoted list of entities, as requested by `ner.jinja`.
+    """
+    items = [
+        {"T": rng.choice(ENTITY_TYPES), "E": _sentence(rng, rng.randint(1, 4))}
+        for _ in range(n_items)
+    ]
+    return repr(items)
+
+
+def classification_output(rng: random.Random, n_items: int) -> str:
+    """
+    A single-quoted list of labels with reasons, as requested by `text_classification.jinja`.
+    """
+    items = [
+        {"C": rng.choice(LABELS), "R": _sentence(rng, rng.randint(5, 20))}
+        for _ in range(n_items)
+    ]
+    return repr(items)
+
+
+def nested_output(rng: random.Random, n_items: int) -> str:
+    """
+    A nested JSON dict.
+    """
+    def node(depth: int):
+        if depth == 0:
+            return rng.choice([rng.randint(0, 1000), _sentence(rng, 3), True, None])
+        return {
+            f"k{i}": node(depth - 1) if rng.random() < 0.7 else [node(depth - 1)]
+            for i in range(3)
+        }
+
+    return json.dumps({"items": [node(3) for _ in range(max(1, n_items // 4))]})
+
+
+def prose_wrapped(rng: random.Random, body: str) -> str:
+    """
+    Wrap an output in the chatter models tend to add around it.
+    """
+    return (
+        f"Here's the answer you asked for: {body}\n"
+        f"Let me know if you'd like me to {_sentence(rng, 6)}."
+    )
+
+
+def truncate(rng: random.Random, text: str) -> str:
+    """
+    Cut the text at a random offset in its second half, like a reply hitting the token limit.
+    """
+    return text[: rng.randint(len(text) // 2, len(text) - 1)]
+
+
+# Truncated outputs that were repaired badly at some point, with the expected completion.
+REGRESSION_CASES = [
+    ('{"a": -1.5e', {"a": -1.5}),
+    ('{"a": [1, 2.', {"a": [1, 2]}),
+    ('{"a": 1, "b": tru', {"a": 1}),
+    ('{"a": 1, "b": "hel', {"a": 1, "b": "hel"}),
+    ("[{'C': 'Sports', 'R': 'the federal bur", [{"C": "Sports", "R": "the federal bur"}]),
+]
+
+
+def generate_corpus(seed: int = 0, samples: int = 20) -> Dict[str, List[str]]:
+    """
+    Generate the corpus as {case name: [outputs]}.
+
+    Case names look like "ner/truncated/medium".
+    """
+    rng = random.Random(seed)
+    generators = {
+        "ner": ner_output,
+        "classification": classification_output,
+        "nested": nested_output,
+    }
+    corpus = {}
+    for kind, generate in generators.items():
+        for size, n_items in SIZES.items():
+            complete = [generate(rng, n_items) for _ in range(samples)]
+            corpus[f"{kind}/complete/{size}"] = complete
+            corpus[f"{kind}/truncated/{size}"] = [truncate(rng, text) for text in complete]
+            corpus[f"{kind}/prose/{size}"] = [prose_wrapped(rng, text) for text in complete]
+            corpus[f"{kind}/prose-truncated/{size}"] = [
+                truncate(rng, prose_wrapped(rng, text)) for text in complete
+            ]
+    corpus["regression/truncated/small"] = [text for text, _ in REGRESSION_CASES]
+    return corpus
@@ -0,0 +1,378 @@
+"""
+Stand-in HTTP server speaking the Ollama and OpenAI chat APIs.
+
+Serves `GET /api/tags`, `POST /api/chat`, `POST /api/generate` (Ollama) and `POST /v1/chat/completions`
+(OpenAI), with or without streaming. Latency, token rate, error and 429
+injection and the shape of the returned bodies are configurable, so `Pipeline`
+throughput can be measured without a GPU box.
+
+    python benchmarks/fake_server.py --port 11434 --latency lognormal:-3,0.5 --tokens-per-sec 200
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import classification_output, ner_output, truncate  # noqa: E402
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution in seconds.
+
+    Supported forms are "constant:S", "uniform:LOW,HIGH" and "lognormal:MU,SIGMA".
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "constant":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unsupported latency distribution: {spec}")
+
+
+class FakeServerConfig:
+    """
+    Behaviour of the fake server.
+
+    Args:
+        models (List[str]): Model names listed by `/api/tags`.
+        latency (str): Distribution of the time to first token, see `parse_latency`.
+        tokens_per_sec (float): Generation speed. 0 returns the whole body at once.
+        error_rate (float): Fraction of requests answered with HTTP 500.
+        rate_limit_rate (float): Fraction of requests answered with HTTP 429.
+        retry_after (float): Value of the Retry-After header of 429 responses.
+        body (str): "ner", "classification" or "mixed" canned outputs.
+        truncate_rate (float): Fraction of bodies cut off mid-way, as if the token limit was hit.
+        items (int): Number of list items in each canned output.
+        load_duration (float): Seconds reported as model load time on the first request.
+        seed (int): Seed of the random generator.
+    """
+
+    def __init__(
+        self,
+        models: List[str] = None,
+        latency: str = "constant:0.05",
+        tokens_per_sec: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        body: str = "classification",
+        truncate_rate: float = 0.0,
+        items: int = 1,
+        load_duration: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.models = models or ["llama3:latest"]
+        self.latency = latency
+        self.sample_latency = parse_latency(latency)
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.body = body
+        self.truncate_rate = truncate_rate
+        self.items = items
+        self.load_duration = load_duration
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.requests = 0
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle's algorithm the body waits
+    # for the client's delayed ACK, adding tens of milliseconds to keep-alive requests.
+    disable_nagle_algorithm = True
+    config: FakeServerConfig = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/":
+            self._send_body(200, b"Ollama is running", "text/plain")
+        elif self.path == "/api/tags":
+            models = [{"name": name, "model": name} for name in self.config.models]
+            self._send_json(200, {"models": models})
+        elif self.path == "/v1/models":
+            models = [{"id": name, "object": "model"} for name in self.config.models]
+            self._send_json(200, {"object": "list", "data": models})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path == "/api/generate" and not request.get("prompt"):
+            # An empty prompt only loads the model, as `Ollama.warmup` does.
+            self._ollama_load(request)
+            return
+        if self.path not in ("/api/chat", "/v1/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        fault, text, latency, load_duration = self._plan()
+        if fault == 429:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                headers={"Retry-After": str(self.config.retry_after)},
+            )
+            return
+        if fault == 500:
+            self._send_json(500, {"error": "injected failure"})
+            return
+
+        time.sleep(latency + load_duration)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in request.get("messages", [])) // 4
+        tokens = self._tokenize(text)
+
+        if self.path == "/api/chat":
+            self._ollama_chat(request, tokens, prompt_tokens, latency, load_duration)
+        else:
+            self._openai_chat(request, tokens, prompt_tokens)
+
+    def _plan(self) -> Tuple[Optional[int], str, float, float]:
+        config = self.config
+        with config.lock:
+            config.requests += 1
+            roll = config.rng.random()
+            if roll < config.rate_limit_rate:
+                return 429, "", 0.0, 0.0
+            if roll < config.rate_limit_rate + config.error_rate:
+                return 500, "", 0.0, 0.0
+
+            body = config.body
+            if body == "mixed":
+                body = config.rng.choice(["ner", "classification"])
+            generate = ner_output if body == "ner" else classification_output
+            text = generate(config.rng, config.items)
+            if config.rng.random() < config.truncate_rate:
+                text = truncate(config.rng, text)
+
+            load_duration = 0.0
+            if not config.loaded:
+                config.loaded = True
+                load_duration = config.load_duration
+            return None, text, config.sample_latency(config.rng), load_duration
+
+    def _ollama_load(self, request):
+        config = self.config
+        with config.lock:
+            load_duration = 0.0 if config.loaded else config.load_duration
+            config.loaded = True
+        time.sleep(load_duration)
+        self._send_json(200, {
+            "model": request.get("model", config.models[0]),
+            "created_at": _now(),
+            "response": "",
+            "done": True,
+            "load_duration": int(load_duration * 1e9),
+        })
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def _token_delay(self) -> float:
+        if self.config.tokens_per_sec <= 0:
+            return 0.0
+        return 1.0 / self.config.tokens_per_sec
+
+    def _ollama_chat(self, request, tokens, prompt_tokens, latency, load_duration):
+        model = request.get("model", self.config.models[0])
+        delay = self._token_delay()
+        timings = {
+            "total_duration": int((latency + load_duration + delay * len(tokens)) * 1e9),
+            "load_duration": int(load_duration * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(latency * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int(delay * len(tokens) * 1e9),
+        }
+
+        if not request.get("stream", True):
+            time.sleep(delay * len(tokens))
+            self._send_json(200, {
+                "model": model,
+                "created_at": _now(),
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "done": True,
+                **timings,
+            })
+            return
+
+        self._start_chunked(200, "application/x-ndjson")
+        for token in tokens:
+            time.sleep(delay)
+            chunk = {
+                "model": model,
+                "created_at": _now(),
+                "message": {"role": "assistant", "content": token},
+                "done": False,
+            }
+            if not self._write_chunk(json.dumps(chunk).encode() + b"\n"):
+                return
+        final = {
+            "model": model,
+            "created_at": _now(),
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            **timings,
+        }
+        self._write_chunk(json.dumps(final).encode() + b"\n")
+        self._write_chunk(b"")
+
+    def _openai_chat(self, request, tokens, prompt_tokens):
+        model = request.get("model", self.config.models[0])
+        delay = self._token_delay()
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+        base = {"id": f"chatcmpl-{self.config.requests}", "created": int(time.time()), "model": model}
+
+        if not request.get("stream", False):
+            time.sleep(delay * len(tokens))
+            self._send_json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }],
+                "usage": usage,
+            })
+            return
+
+        self._start_chunked(200, "text/event-stream")
+        for token in tokens:
+            time.sleep(delay)
+            chunk = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            if not self._write_chunk(b"data: " + json.dumps(chunk).encode() + b"\n\n"):
+                return
+        final = {
+            **base,
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        self._write_chunk(b"data: " + json.dumps(final).encode() + b"\n\n")
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _send_json(self, status: int, payload, headers=None):
+        self._send_body(status, json.dumps(payload).encode(), "application/json", headers)
+
+    def _send_body(self, status: int, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_chunked(self, status: int, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: bytes) -> bool:
+        """
+        Write one chunk of a chunked response. Returns False once the client went away.
+        """
+        try:
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            return False
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def start_server(config: FakeServerConfig, host: str = "127.0.0.1", port: int = 0):
+    """
+    Start the fake server in a daemon thread. Returns the server and its base URL.
+    """
+    handler = type("ConfiguredFakeLLMHandler", (FakeLLMHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the FakeServerConfig options to an argument parser.
+    """
+    parser.add_argument("--models", type=lambda s: s.split(","), default=["llama3:latest", "gpt-3.5-turbo"])
+    parser.add_argument("--latency", default="constant:0.05")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--body", choices=["ner", "classification", "mixed"], default="classification")
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=1)
+    parser.add_argument("--load-duration", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args) -> FakeServerConfig:
+    return FakeServerConfig(
+        models=args.models,
+        latency=args.latency,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        body=args.body,
+        truncate_rate=args.truncate_rate,
+        items=args.items,
+        load_duration=args.load_duration,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server, url = start_server(config_from_args(args), args.host, args.port)
+    print(f"Fake Ollama/OpenAI server listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cold-start import benchmark for `ollama_prompter`.
+
+Imports the package in fresh interpreters, reports the median time spent in
+the import statement, and fails when it exceeds the budget or when a backend
+SDK is imported eagerly.
+
+    python benchmarks/import_time.py --budget-ms 50
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+
+HEAVY_MODULES = ["openai", "tiktoken", "ollama", "jinja2", "tenacity", "tqdm", "httpx"]
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def time_statement(statement: str, repeat: int) -> float:
+    """
+    Return the median wall time of running the statement in a fresh interpreter, in milliseconds.
+    """
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"{statement}; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def eagerly_imported(statement: str):
+    """
+    Return the heavy modules loaded as a side effect of the statement.
+    """
+    code = (
+        f"import sys; {statement}; import json; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Cold-start budget of `import ollama_prompter`.")
+    parser.add_argument("--repeat", type=int, default=15, help="Number of fresh interpreters per measurement.")
+    parser.add_argument("--backends", action="store_true", help="Also time importing each backend.")
+    args = parser.parse_args()
+
+    import_ms = time_statement("import ollama_prompter", args.repeat)
+    print(f"import ollama_prompter: {import_ms:.1f} ms (budget {args.budget_ms:.1f} ms)")
+
+    if args.backends:
+        for name in ["Ollama", "OpenAI", "Prompter", "Pipeline"]:
+            try:
+                backend_ms = time_statement(f"from ollama_prompter import {name}", args.repeat)
+            except subprocess.CalledProcessError:
+                print(f"from ollama_prompter import {name}: unavailable")
+                continue
+            print(f"from ollama_prompter import {name}: {backend_ms:.1f} ms")
+
+    failed = False
+    loaded = eagerly_imported("import ollama_prompter")
+    if loaded:
+        print(f"FAIL: `import ollama_prompter` eagerly imports {', '.join(loaded)}")
+        failed = True
+    if import_ms > args.budget_ms:
+        print("FAIL: cold-start budget exceeded")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
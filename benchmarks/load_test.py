@@ -0,0 +1,170 @@
+"""
+End-to-end load test of `Pipeline` against the fake Ollama/OpenAI server.
+
+Starts `fake_server.py` in-process (or targets --url), runs the pipeline in the
+chosen execution mode and reports requests/sec, latency percentiles and how
+the time splits between template rendering, the network call and parsing.
+
+    python benchmarks/load_test.py --backend ollama --mode fit_many --workers 8 --requests 500
+    python benchmarks/load_test.py --backend openai --mode amap --workers 32 --latency lognormal:-3,0.5
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from collections import defaultdict
+from typing import Dict, List
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_server import add_config_arguments, config_from_args, start_server  # noqa: E402
+from ollama_prompter import Ollama, OpenAI, Pipeline, Prompter  # noqa: E402
+from ollama_prompter.metrics import Hook, Span, tracer  # noqa: E402
+
+
+class StageTimer(Hook):
+    """
+    Tracer hook accumulating the time spent in each stage reported by the library.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def on_span_end(self, span: Span):
+        with self.lock:
+            self.totals[span.name] += span.duration
+            self.counts[span.name] += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def build_pipeline(args, url: str) -> Pipeline:
+    if args.backend == "ollama":
+        model = Ollama(model_name=args.model or "llama3:latest", endpoint=url, api_retry=args.retries)
+    else:
+        model = OpenAI(
+            api_key="fake",
+            model_name=args.model or "gpt-3.5-turbo",
+            base_url=f"{url}/v1",
+            api_retry=args.retries,
+        )
+    prompter = Prompter(
+        template_name="text_classification.jinja",
+        template_dir=os.path.join(REPO_DIR, "templates"),
+    )
+
+    # Every input is distinct and the cache is off, so each request reaches the server.
+    return Pipeline([prompter], model, cache_prompt=False, json_depth_limit=args.json_depth_limit)
+
+
+def run(args, pipe: Pipeline, texts: List[str]) -> List[float]:
+    """
+    Run the pipeline over the texts and return the latency of each item.
+    """
+    variables = {"labels": ["World", "Sports", "Business", "Sci/Tech"], "exclusive_classes": True}
+    latencies = []
+
+    if args.mode == "fit":
+        for text in texts:
+            start = time.perf_counter()
+            pipe.fit(text, **variables)
+            latencies.append(time.perf_counter() - start)
+
+    elif args.mode == "fit_many":
+        # Per-item latency is measured inside the worker.
+        original = pipe._fit_record
+
+        def timed_fit_record(*a, **kw):
+            start = time.perf_counter()
+            try:
+                return original(*a, **kw)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+        pipe._fit_record = timed_fit_record
+        for _ in pipe.fit_many(texts, workers=args.workers, ordered=False, **variables):
+            pass
+
+    elif args.mode == "amap":
+        # `amap` runs each text through `_afit`, so per-item latency is measured there.
+        original = pipe._afit
+
+        async def timed_afit(*a, **kw):
+            start = time.perf_counter()
+            try:
+                return await original(*a, **kw)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+        pipe._afit = timed_afit
+        asyncio.run(pipe.amap(texts, concurrency=args.workers, **variables))
+
+    return latencies
+
+
+def report(args, elapsed: float, latencies: List[float], timer: StageTimer):
+    print(f"backend={args.backend} mode={args.mode} workers={args.workers} requests={len(latencies)}")
+    print(f"  throughput : {len(latencies) / elapsed:.1f} req/s over {elapsed:.2f} s")
+    print(
+        "  latency    : "
+        f"p50 {percentile(latencies, 0.50) * 1000:.1f} ms, "
+        f"p90 {percentile(latencies, 0.90) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms"
+    )
+    stages = {"render": "render", "model_call": "network", "parse": "parse"}
+    total = sum(timer.totals[stage] for stage in stages) or 1.0
+    for stage, label in stages.items():
+        count = timer.counts[stage] or 1
+        print(
+            f"  {label:<11}: {timer.totals[stage] / count * 1000:8.3f} ms/call "
+            f"({timer.totals[stage] / total:6.1%} of stage time)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["ollama", "openai"], default="ollama")
+    parser.add_argument("--mode", choices=["fit", "fit_many", "amap"], default="fit_many")
+    parser.add_argument("--workers", type=int, default=8, help="Threads for fit_many, concurrency for amap.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--json-depth-limit", type=int, default=20)
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--url", default=None, help="Target an already running server instead of starting one.")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    url = args.url
+    server = None
+    if url is None:
+        server, url = start_server(config_from_args(args))
+
+    timer = tracer.add_hook(StageTimer())
+    pipe = build_pipeline(args, url)
+    texts = [f"Cikamatana reaches the end of long road to the Olympics, take {i}." for i in range(args.requests)]
+
+    start = time.perf_counter()
+    latencies = run(args, pipe, texts)
+    elapsed = time.perf_counter() - start
+    report(args, elapsed, latencies, timer)
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark suite for `Parser` over a generated corpus of LLM outputs.
+
+Times `Parser.fit`, `Parser.get_possible_completions` and
+`Parser.extract_complete_objects` on complete, truncated and prose-wrapped
+outputs of several sizes, for each engine and depth limit. Reports ops/sec,
+p50/p99 latency and peak memory per case. Results can be saved and compared
+against a previous run.
+
+    python benchmarks/parser_bench.py --save parser_baseline.json
+    python benchmarks/parser_bench.py --compare parser_baseline.json --fail-on-regression 0.2
+"""
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import REGRESSION_CASES, generate_corpus  # noqa: E402
+from ollama_prompter.parser import Parser  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func: Callable[[str], object], samples: List[str], min_time: float) -> Dict[str, float]:
+    """
+    Run func over the samples until at least min_time seconds have passed.
+    """
+    latencies = []
+    started = time.perf_counter()
+    while True:
+        for sample in samples:
+            t = time.perf_counter()
+            func(sample)
+            latencies.append(time.perf_counter() - t)
+        if time.perf_counter() - started >= min_time:
+            break
+
+    tracemalloc.start()
+    for sample in samples:
+        func(sample)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": len(latencies) / sum(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_kb": peak / 1024,
+        "runs": len(latencies),
+    }
+
+
+def build_cases(args) -> Dict[str, Callable[[str], object]]:
+    """
+    Return {case prefix: function} for every method, engine and depth limit.
+    """
+    cases = {}
+    for engine in args.engines:
+        parser = Parser(engine=engine)
+        for depth in args.depth_limits:
+            if engine == "search" and depth > args.search_max_depth:
+                # The search engine tries 2^depth closing sequences.
+                continue
+            cases[f"fit/{engine}/depth={depth}"] = (
+                lambda text, parser=parser, depth=depth: parser.fit(text, depth)
+            )
+            cases[f"completions/{engine}/depth={depth}"] = (
+                lambda text, parser=parser, depth=depth: _completions(parser, text, depth)
+            )
+    cases["extract"] = Parser().extract_complete_objects
+    return cases
+
+
+def _completions(parser: Parser, text: str, depth: int):
+    try:
+        return parser.get_possible_completions(text, json_depth_limit=depth)
+    except Exception:
+        return None
+
+
+def check_regressions() -> bool:
+    """
+    Print the regression cases the stack engine does not repair as expected. Return True if there is any.
+    """
+    failed = False
+    parser = Parser(engine="stack")
+    for text, expected in REGRESSION_CASES:
+        parsed = parser.fit(text, 20)
+        completion = parsed["data"].get("completion") if parsed["status"] == "completed" else None
+        if completion != expected:
+            print(f"REGRESSION {text!r}: expected {expected!r}, got {parsed['data']!r}")
+            failed = True
+    return failed
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> bool:
+    """
+    Print the speedup of every case against the baseline. Return True if any case regressed by more than threshold.
+    """
+    regressed = False
+    print()
+    print(f"{'case':<70} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result["ops_per_sec"] / baseline[key]["ops_per_sec"]
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{key:<70} {baseline[key]['ops_per_sec']:>12.1f} "
+            f"{result['ops_per_sec']:>12.1f} {ratio:>7.2f}x{flag}"
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", type=lambda s: s.split(","), default=list(Parser.ENGINES))
+    parser.add_argument("--depth-limits", type=lambda s: [int(d) for d in s.split(",")], default=[5, 20, 50])
+    parser.add_argument("--search-max-depth", type=int, default=8, help="Skip the search engine above this depth limit.")
+    parser.add_argument("--search-max-chars", type=int, default=1000, help="Skip the search engine on outputs longer than this.")
+    parser.add_argument("--cases", default="*", help="Glob over case names, e.g. 'fit/stack/*/ner/truncated/*'.")
+    parser.add_argument("--samples", type=int, default=10, help="Outputs per corpus entry.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds spent per case.")
+    parser.add_argument("--save", help="Write results to this JSON file.")
+    parser.add_argument("--compare", help="Compare against results saved with --save.")
+    parser.add_argument("--fail-on-regression", type=float, default=None, help="Exit non-zero if ops/sec drops by more than this fraction.")
+    args = parser.parse_args()
+
+    if check_regressions():
+        sys.exit(1)
+
+    corpus = generate_corpus(seed=args.seed, samples=args.samples)
+    results = {}
+    print(f"{'case':<70} {'ops/sec':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>9}")
+    for prefix, func in build_cases(args).items():
+        for corpus_name, samples in corpus.items():
+            key = f"{prefix}/{corpus_name}"
+            if not fnmatch.fnmatch(key, args.cases):
+                continue
+            if "/search/" in key and max(map(len, samples)) > args.search_max_chars:
+                # The search engine re-evaluates the whole text once per stripped character.
+                continue
+            result = measure(func, samples, args.min_time)
+            results[key] = result
+            print(
+                f"{key:<70} {result['ops_per_sec']:>10.1f} {result['p50_ms']:>9.3f} "
+                f"{result['p99_ms']:>9.3f} {result['peak_kb']:>9.1f}"
+            )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args.fail_on_regression or 0.0)
+        if args.fail_on_regression is not None and regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,31 @@
-from ollama_prompter.models.api.openai_model import OpenAI
-from ollama_prompter.models.api.ollama_model import Ollama
-from ollama_prompter.prompter.prompter import Prompter
-from ollama_prompter.pipeline.pipeline import Pipeline
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ollama_prompter.models.api.openai_model import OpenAI
+    from ollama_prompter.models.api.ollama_model import Ollama
+    from ollama_prompter.prompter.prompter import Prompter
+    from ollama_prompter.pipeline.pipeline import Pipeline
+
+# Backends are imported on first attribute access, so `import ollama_prompter`
+# does not pay for SDKs that are never used.
+_LAZY_ATTRIBUTES = {
+    "OpenAI": "ollama_prompter.models.api.openai_model",
+    "Ollama": "ollama_prompter.models.api.ollama_model",
+    "Prompter": "ollama_prompter.prompter.prompter",
+    "Pipeline": "ollama_prompter.pipeline.pipeline",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
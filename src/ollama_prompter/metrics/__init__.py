@@ -0,0 +1,3 @@
+from ollama_prompter.metrics.tracing import Hook, Span, Tracer, current_span, tracer
+from ollama_prompter.metrics.collector import Histogram, HistogramCollector
+from ollama_prompter.metrics.prometheus import prometheus_text
@@ -0,0 +1,141 @@
+import math
+import bisect
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from ollama_prompter.metrics.tracing import Hook, Span
+
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+TOKENS_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+# Name of the histogram of span durations, labelled with the stage name.
+STAGE_METRIC = "stage_duration_seconds"
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values over fixed bucket upper bounds.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Yield (upper bound, cumulative count) pairs, ending with +Inf.
+        """
+        total = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        lower, previous = 0.0, 0
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if math.isinf(bound):
+                    return lower
+                fraction = (rank - previous) / (total - previous) if total > previous else 1.0
+                return lower + (bound - lower) * fraction
+            lower, previous = bound, total
+        return lower
+
+
+class HistogramCollector(Hook):
+    """
+    Hook aggregating span durations and observed metrics into histograms.
+
+    Span durations go to the "stage_duration_seconds" histogram, labelled with
+    the stage and the span attributes. Other metrics get a histogram of their
+    own name, with buckets picked from the name: seconds for "*_seconds",
+    rates for "*_per_second" and counts for "*_tokens".
+
+    Args:
+        buckets (Dict[str, Sequence[float]]): Bucket upper bounds per metric name, overriding the defaults.
+    """
+
+    def __init__(self, buckets: Optional[Dict[str, Sequence[float]]] = None) -> None:
+        self.buckets = dict(buckets or {})
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def _buckets(self, name: str) -> Sequence[float]:
+        if name in self.buckets:
+            return self.buckets[name]
+        if name.endswith("_per_second"):
+            return TOKENS_PER_SECOND_BUCKETS
+        if name.endswith("_tokens"):
+            return TOKENS_BUCKETS
+        return SECONDS_BUCKETS
+
+    def observe(self, name: str, value: float, labels: Dict[str, Any]):
+        key = tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets(name))
+            histogram.observe(value)
+
+    def on_span_end(self, span: Span):
+        self.observe(STAGE_METRIC, span.duration, {"stage": span.name, **span.attributes})
+
+    def on_metric(self, name: str, value: float, attributes: Dict[str, Any]):
+        self.observe(name, value, attributes)
+
+    def histograms(self) -> Dict[str, Dict[LabelSet, Histogram]]:
+        """
+        Get a snapshot of the histograms: metric name -> label set -> histogram.
+        """
+        with self._lock:
+            snapshot = {}
+            for name, series in self._histograms.items():
+                snapshot[name] = {}
+                for labels, histogram in series.items():
+                    copy = Histogram(histogram.bounds)
+                    copy.counts = list(histogram.counts)
+                    copy.count, copy.sum = histogram.count, histogram.sum
+                    snapshot[name][labels] = copy
+            return snapshot
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Get count, mean and estimated p50/p90/p99 per metric and label set.
+        """
+        summary = {}
+        for name, series in self.histograms().items():
+            summary[name] = {}
+            for labels, histogram in series.items():
+                label = ",".join(f"{k}={v}" for k, v in labels)
+                summary[name][label] = {
+                    "count": histogram.count,
+                    "mean": histogram.sum / histogram.count if histogram.count else None,
+                    "p50": histogram.quantile(0.50),
+                    "p90": histogram.quantile(0.90),
+                    "p99": histogram.quantile(0.99),
+                }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
@@ -0,0 +1,45 @@
+import re
+import math
+
+from ollama_prompter.metrics.collector import HistogramCollector
+
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _metric_name(prefix: str, name: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", f"{prefix}_{name}" if prefix else name)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{_INVALID_NAME_CHARS.sub("_", k)}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def prometheus_text(collector: HistogramCollector, prefix: str = "ollama_prompter") -> str:
+    """
+    Render the histograms of a collector in the Prometheus text exposition format.
+
+    Serve the result from a `/metrics` endpoint or write it for the node exporter's
+    textfile collector.
+    """
+    lines = []
+    for name, series in sorted(collector.histograms().items()):
+        metric = _metric_name(prefix, name)
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, histogram in sorted(series.items()):
+            for bound, total in histogram.cumulative():
+                bucket_labels = _format_labels(labels + (("le", _format_bound(bound)),))
+                lines.append(f"{metric}_bucket{bucket_labels} {total}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum!r}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,172 @@
+import time
+import contextvars
+from typing import Any, Dict, List, Optional
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("ollama_prompter_span", default=None)
+
+
+class Hook:
+    """
+    Base class of metrics and tracing hooks. Override the callbacks of interest.
+
+    Callbacks run synchronously in the thread or task doing the work, so they
+    should be cheap; errors raised by a hook are reported and otherwise ignored.
+    """
+
+    def on_span_start(self, span: "Span"):
+        """
+        Called when a stage starts.
+        """
+
+    def on_span_end(self, span: "Span"):
+        """
+        Called when a stage ends, with `span.duration` and `span.error` set.
+        """
+
+    def on_metric(self, name: str, value: float, attributes: Dict[str, Any]):
+        """
+        Called with a value observed outside of a span, e.g. a timing reported by the server.
+        """
+
+
+class Span:
+    """
+    One timed stage of the work, used as a context manager.
+
+    Spans opened inside another span, in the same thread or asyncio task, have it as `parent`.
+
+    Attributes:
+        name (str): Name of the stage, e.g. "render" or "model_call".
+        attributes (Dict[str, Any]): Low-cardinality labels of the stage, e.g. the template name.
+        duration (float): Seconds between start and end, once ended.
+        error (BaseException): Exception raised inside the span, if any.
+        parent (Span): Enclosing span, if any.
+    """
+    __slots__ = ("tracer", "name", "attributes", "parent", "start", "end", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.parent: Optional[Span] = None
+        self.start = 0.0
+        self.end: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        self.tracer._dispatch("on_span_start", self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end = time.perf_counter()
+        self.error = exc
+        _current_span.reset(self._token)
+        self.tracer._dispatch("on_span_end", self)
+        return False
+
+
+class _NullSpan:
+    """
+    Span handed out while no hook is registered, so tracing costs next to nothing.
+    """
+    name = None
+    attributes: Dict[str, Any] = {}
+    parent = None
+    duration = None
+    error = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Dispatches spans and metrics to the registered hooks.
+
+    The library reports its stages to the process-wide `tracer`: template
+    rendering ("render"), prompt cache lookups ("cache_lookup"), waiting for a
+    worker ("queue"), model calls including retries ("model_call") and output
+    parsing ("parse"). Models report server-side timings as metrics.
+
+    Args:
+        hooks (List[Hook]): Hooks receiving the spans and metrics.
+    """
+
+    def __init__(self, hooks: Optional[List[Hook]] = None) -> None:
+        self.hooks: List[Hook] = list(hooks or [])
+
+    def add_hook(self, hook: Hook) -> Hook:
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook: Hook):
+        self.hooks.remove(hook)
+
+    def span(self, name: str, **attributes):
+        """
+        Context manager timing a stage.
+        """
+        if not self.hooks:
+            return _NULL_SPAN
+        return Span(self, name, attributes)
+
+    def record_span(self, name: str, duration: float, **attributes):
+        """
+        Report a stage timed by the caller, e.g. the time a task waited in a queue.
+        """
+        if not self.hooks:
+            return
+        span = Span(self, name, attributes)
+        span.parent = _current_span.get()
+        span.end = time.perf_counter()
+        span.start = span.end - duration
+        self._dispatch("on_span_end", span)
+
+    def observe(self, name: str, value: float, **attributes):
+        """
+        Report a value observed outside of a span.
+        """
+        for hook in self.hooks:
+            try:
+                hook.on_metric(name, value, attributes)
+            except Exception as e:
+                print(f"Error in metrics hook {hook!r}: {e}")
+
+    def _dispatch(self, callback: str, span: Span):
+        for hook in self.hooks:
+            try:
+                getattr(hook, callback)(span)
+            except Exception as e:
+                print(f"Error in metrics hook {hook!r}: {e}")
+
+
+def current_span() -> Optional[Span]:
+    """
+    Get the innermost span open in the current thread or asyncio task.
+    """
+    return _current_span.get()
+
+
+tracer = Tracer()
@@ -1 +1,21 @@
-from ollama_prompter.models.api.openai_model import OpenAI
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ollama_prompter.models.api.openai_model import OpenAI
+    from ollama_prompter.models.api.replay_model import ReplayModel
+
+_LAZY_ATTRIBUTES = {
+    "OpenAI": "ollama_prompter.models.api.openai_model",
+    "ReplayModel": "ollama_prompter.models.api.replay_model",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
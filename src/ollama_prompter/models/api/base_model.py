@@ -1,7 +1,19 @@
-import tenacity
+import asyncio
+
 from abc import ABCMeta, abstractmethod
 from typing import List, Dict, Union, Mapping, Iterator, Any
 
+from ollama_prompter.parser import Parser
+from ollama_prompter.parser.schema import parse_json_output
+from ollama_prompter.models.api.retry_policy import CircuitBreaker, RetryBudget, RetryPolicy
+
+
+def make_usage(prompt_tokens: int = None, completion_tokens: int = None, cached: bool = False) -> Dict[str, Any]:
+    """
+    Normalized token usage of a result. Token counts are None when the endpoint does not report them.
+    """
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cached": cached}
+
 
 class BaseModel(metaclass=ABCMeta):
     """
@@ -12,9 +24,14 @@ class BaseModel(metaclass=ABCMeta):
         model_name (str): Name of the model.
         api_await (bool): Waiting time for the API to finish in seconds.
         api_retry (int): Retrying time for the API to finish.
+        verify (str): When to verify that the model is supported by the endpoint:
+            "eager" at construction, "lazy" on first use, or "off" to skip it.
+        retry_policy (RetryPolicy): Retry policy of the requests. Defaults to `api_retry` attempts
+            waiting up to `api_await` seconds, with a retry budget and a circuit breaker.
     """
     name = ""
     description = ""
+    VERIFY_MODES = ("eager", "lazy", "off")
 
     def __init__(
         self, 
@@ -22,12 +39,26 @@ class BaseModel(metaclass=ABCMeta):
         model_name: str, 
         api_await: int = 60, 
         api_retry: int = 5, 
+        verify: str = "eager", 
+        retry_policy: RetryPolicy = None, 
     ) -> None:
+        if verify not in self.VERIFY_MODES:
+            raise ValueError(f"Unsupported verify mode: {verify}")
         self.api_key = api_key
         self.model_name = model_name
         self.api_await = api_await
         self.api_retry = api_retry
-        self._verify_model()
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=api_retry, 
+            max_wait=api_await, 
+            budget=RetryBudget(), 
+            breaker=CircuitBreaker(), 
+        )
+        self.verify = verify
+        self._verified = False
+        if self.verify == "eager":
+            self._verify_model()
+            self._verified = True
         self.set_key(api_key)
 
     @abstractmethod
@@ -37,6 +68,15 @@ class BaseModel(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def _ensure_verified(self):
+        """
+        Verify the model on first use when verification is deferred.
+        """
+        if self._verified or self.verify == "off":
+            return
+        self._verify_model()
+        self._verified = True
+
     @abstractmethod
     def set_key(self, api_key: str):
         """
@@ -98,15 +138,38 @@ class BaseModel(metaclass=ABCMeta):
         raise NotImplementedError
     
     @abstractmethod
-    def run(self, prompt: str) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
+    def run(self, prompt: str, output_schema: Dict[str, Any] = None) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
         """
         Run the LLM on the given prompt.
 
         Args:
             prompt (str): It serves as a form of conditioning that guides the model's output.
+            output_schema (dict): JSON schema of the expected output. When given, the
+                endpoint is asked for JSON output if it supports it.
         """
         raise NotImplementedError
     
+    async def arun(self, prompt: str, output_schema: Dict[str, Any] = None) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
+        """
+        Run the LLM on the given prompt without blocking the event loop.
+
+        Args:
+            prompt (str): It serves as a form of conditioning that guides the model's output.
+            output_schema (dict): JSON schema of the expected output, see `run`.
+        """
+        raise NotImplementedError(f"{self.name} does not support async execution.")
+    
+    def run_stream(self, prompt: str, output_schema: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Run the LLM on the given prompt and yield the generated text as it arrives.
+        Closing the iterator cancels the generation.
+
+        Args:
+            prompt (str): It serves as a form of conditioning that guides the model's output.
+            output_schema (dict): JSON schema of the expected output, see `run`.
+        """
+        raise NotImplementedError(f"{self.name} does not support streaming.")
+
     @abstractmethod
     def model_output(self, response: Any) -> Dict:
         """
@@ -114,20 +177,69 @@ class BaseModel(metaclass=ABCMeta):
         """
         raise NotImplementedError
     
-    def _retry_decorator(self):
+    def model_output_from_text(self, text: str, json_depth_limit: int, output_schema: Dict[str, Any] = None) -> Dict:
         """
-        Decorator function for retrying API requests if they fail.
+        Get the model output from the generated text, e.g. after streaming.
         """
-        return tenacity.retry(
-            wait=tenacity.wait_random_exponential(
-                multiplier=0.3, exp_base=3, max=self.api_await
-            ),
-            stop=tenacity.stop_after_attempt(self.api_retry),
-        )
+        data = {"text": text.strip()}
+        data["parsed"] = self.parse_text(data["text"], json_depth_limit, output_schema)
+        data["usage"] = make_usage()
+        return data
+
+    def usage(self, response: Any) -> Dict[str, Any]:
+        """
+        Get the normalized token usage of a response, see `make_usage`.
+        """
+        return make_usage()
+
+    def parse_text(self, text: str, json_depth_limit: int, output_schema: Dict[str, Any] = None) -> Dict:
+        """
+        Parse the generated text. With an output schema, text that is valid JSON matching
+        the schema is loaded directly, and the repair engine is only used as a fallback.
+        """
+        if output_schema is not None:
+            parsed = parse_json_output(text, output_schema)
+            if parsed is not None:
+                return parsed
+        return Parser().fit(text, json_depth_limit)
 
     def execute_with_retry(self, *args, **kwargs):
         """
-        Decorated version of the run method with the retry logic.
+        Run method with the retry logic of `retry_policy`.
+        """
+        self._ensure_verified()
+        return self.retry_policy.call(self.run, *args, **kwargs)
+
+    def execute_stream_with_retry(self, *args, **kwargs) -> Iterator[str]:
+        """
+        Run_stream method with the retry logic of `retry_policy` applied to opening the
+        stream, up to the first chunk. Errors after text has been yielded are raised as is,
+        since a generation cannot be resumed halfway.
+        """
+        self._ensure_verified()
+
+        def _open():
+            stream = self.run_stream(*args, **kwargs)
+            try:
+                return stream, next(stream, None)
+            except BaseException:
+                stream.close()
+                raise
+
+        stream, first = self.retry_policy.call(_open)
+        try:
+            if first is not None:
+                yield first
+                yield from stream
+        finally:
+            stream.close()
+
+    async def aexecute_with_retry(self, *args, **kwargs):
+        """
+        Arun method with the retry logic of `retry_policy`.
+
+        Waiting between attempts uses `asyncio.sleep`, so other tasks keep running.
         """
-        decorated_run = self._retry_decorator()(self.run)
-        return decorated_run(*args, **kwargs)
\ No newline at end of file
+        if not self._verified and self.verify == "lazy":
+            await asyncio.to_thread(self._ensure_verified)
+        return await self.retry_policy.acall(self.arun, *args, **kwargs)
\ No newline at end of file
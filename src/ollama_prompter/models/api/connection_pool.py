@@ -0,0 +1,82 @@
+import asyncio
+import importlib.util
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+
+class ConnectionPool:
+    """
+    Settings of the HTTP connection pool owned by a model.
+
+    A model builds its HTTP clients once from these settings and reuses them for
+    every request, so connections are kept alive instead of paying TCP and TLS
+    setup per call.
+
+    Args:
+        max_connections (int): Maximum number of concurrent connections.
+        max_keepalive_connections (int): Maximum number of idle connections kept alive.
+        keepalive_expiry (float): Seconds an idle connection is kept alive.
+        http2 (bool): Use HTTP/2 when the `h2` package is installed.
+        timeout (float): Default timeout of a request in seconds. None for no timeout.
+        connect_timeout (float): Timeout for establishing a connection in seconds.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = 10.0,
+    ) -> None:
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        """
+        Get the keyword arguments of an `httpx.Client` or `httpx.AsyncClient`.
+        """
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "http2": self.http2,
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        }
+
+    def build_client(self) -> httpx.Client:
+        """
+        Build a synchronous HTTP client with these settings.
+        """
+        return httpx.Client(**self.client_kwargs())
+
+    def build_async_client(self) -> httpx.AsyncClient:
+        """
+        Build an asynchronous HTTP client with these settings.
+        """
+        return httpx.AsyncClient(**self.client_kwargs())
+
+
+def close_with_loop(close: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+    """
+    Await `close` when the running event loop shuts down.
+
+    Returns a task that waits until it is cancelled and then awaits `close`. `asyncio.run`
+    cancels every pending task before closing its loop, so a client bound to the loop is
+    closed on it instead of leaking its connections. Cancel the task to close the client earlier.
+    """
+    async def _close_when_cancelled():
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await close()
+
+    return asyncio.get_running_loop().create_task(_close_when_cancelled())
@@ -0,0 +1,225 @@
+import time
+import random
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """
+    Whether an error means the endpoint is unhealthy: connection errors, timeouts and 5xx
+    responses. Other errors, e.g. a 4xx for a bad request, say nothing about the endpoint.
+    """
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and status_code > 0:
+        return status_code >= 500
+    return isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+class EndpointState:
+    """
+    Routing state and latency statistics of one endpoint.
+
+    Attributes:
+        endpoint (str): URL of the endpoint.
+        weight (float): Relative share of the traffic.
+        client (Any): Client bound to the endpoint.
+        outstanding (int): Requests currently in flight.
+        healthy (bool): Whether the endpoint receives traffic.
+    """
+
+    def __init__(self, endpoint: str, weight: float, client: Any) -> None:
+        self.endpoint = endpoint
+        self.weight = weight
+        self.client = client
+        self.async_client = None
+        self.async_client_loop = None
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.ewma_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> Dict[str, Any]:
+        completed = self.requests - self.errors
+        return {
+            "healthy": self.healthy,
+            "weight": self.weight,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_latency_ms": self.total_latency / completed * 1000 if completed else None,
+            "ewma_latency_ms": self.ewma_latency * 1000 if self.ewma_latency is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class LoadBalancer:
+    """
+    Routes requests over several endpoints of the same service.
+
+    With the "least_outstanding" strategy a request goes to the healthy endpoint
+    with the fewest in-flight requests relative to its weight; with "weighted"
+    endpoints are picked at random in proportion to their weight. An endpoint is
+    ejected after `failure_threshold` consecutive failed requests, as told by
+    `is_failure`, and re-admitted once a health check succeeds. When every endpoint is ejected, requests are
+    routed over all of them rather than failing outright.
+
+    Args:
+        endpoints (List[str]): URLs of the endpoints.
+        client_factory (Callable): Builds the client of an endpoint from its URL.
+        health_check (Callable): Called with an endpoint state, raises if the endpoint is unhealthy.
+        weights (List[float]): Relative weights of the endpoints. Defaults to equal weights.
+        strategy (str): "least_outstanding" or "weighted".
+        failure_threshold (int): Consecutive failures before an endpoint is ejected.
+        health_check_interval (float): Seconds between two health check rounds.
+        ewma_alpha (float): Smoothing factor of the moving average latency.
+        is_failure (Callable): Whether an error raised by a request counts as a failure of
+            the endpoint. Defaults to `is_endpoint_failure`.
+    """
+    STRATEGIES = ("least_outstanding", "weighted")
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        client_factory: Callable[[str], Any],
+        health_check: Callable[[EndpointState], Any],
+        weights: Optional[List[float]] = None,
+        strategy: str = "least_outstanding",
+        failure_threshold: int = 3,
+        health_check_interval: float = 10.0,
+        ewma_alpha: float = 0.2,
+        is_failure: Callable[[BaseException], bool] = is_endpoint_failure,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("At least one endpoint is required.")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unsupported routing strategy: {strategy}")
+        weights = weights or [1.0] * len(endpoints)
+        if len(weights) != len(endpoints):
+            raise ValueError("Expected one weight per endpoint.")
+
+        self.endpoints = [
+            EndpointState(endpoint, weight, client_factory(endpoint))
+            for endpoint, weight in zip(endpoints, weights)
+        ]
+        self.health_check = health_check
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.health_check_interval = health_check_interval
+        self.ewma_alpha = ewma_alpha
+        self.is_failure = is_failure
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        self._rng = random.Random()
+
+    def acquire(self) -> EndpointState:
+        """
+        Pick an endpoint and count the request as in flight.
+        """
+        with self._lock:
+            candidates = [state for state in self.endpoints if state.healthy] or self.endpoints
+            if self.strategy == "weighted":
+                state = self._rng.choices(candidates, weights=[s.weight for s in candidates])[0]
+            else:
+                # Ties, e.g. with sequential traffic, go to the endpoint with the least share so far.
+                state = min(
+                    candidates,
+                    key=lambda s: (s.outstanding / s.weight, s.requests / s.weight),
+                )
+            state.outstanding += 1
+            state.requests += 1
+            return state
+
+    def release(self, state: EndpointState, elapsed: float, error: Optional[BaseException] = None):
+        """
+        Record the outcome of a request routed to the endpoint.
+        """
+        with self._lock:
+            state.outstanding -= 1
+            if error is not None:
+                state.errors += 1
+                state.last_error = repr(error)
+                if self.is_failure(error):
+                    state.consecutive_failures += 1
+                    if state.consecutive_failures >= self.failure_threshold:
+                        state.healthy = False
+                return
+            state.consecutive_failures = 0
+            state.total_latency += elapsed
+            if state.ewma_latency is None:
+                state.ewma_latency = elapsed
+            else:
+                state.ewma_latency += self.ewma_alpha * (elapsed - state.ewma_latency)
+
+    @contextmanager
+    def route(self) -> Iterator[EndpointState]:
+        """
+        Context manager routing one request.
+        """
+        state = self.acquire()
+        start = time.perf_counter()
+        try:
+            yield state
+        except (GeneratorExit, asyncio.CancelledError):
+            # The caller stopped consuming, the endpoint did nothing wrong.
+            self.release(state, time.perf_counter() - start)
+            raise
+        except BaseException as e:
+            self.release(state, time.perf_counter() - start, error=e)
+            raise
+        self.release(state, time.perf_counter() - start)
+
+    def check_health(self):
+        """
+        Run one round of health checks, ejecting failing endpoints and re-admitting recovered ones.
+        """
+        for state in self.endpoints:
+            try:
+                self.health_check(state)
+            except Exception as e:
+                with self._lock:
+                    state.healthy = False
+                    state.last_error = repr(e)
+                continue
+            with self._lock:
+                state.healthy = True
+                state.consecutive_failures = 0
+
+    def start_health_checks(self):
+        """
+        Run health checks periodically in a daemon thread.
+        """
+        if self._health_thread is not None or self.health_check_interval <= 0:
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.wait(self.health_check_interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=_loop, name="ollama-health-check", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        """
+        Stop the periodic health checks.
+        """
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get routing and latency statistics per endpoint.
+        """
+        with self._lock:
+            return {state.endpoint: state.stats() for state in self.endpoints}
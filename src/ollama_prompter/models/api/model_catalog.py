@@ -0,0 +1,73 @@
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class ModelCatalog:
+    """
+    Process-wide cache of the models available on each endpoint.
+
+    Every model instance pointing at the same endpoint shares one catalog entry,
+    which is fetched at most once per `ttl` seconds.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoint_locks: Dict[str, threading.Lock] = {}
+        # endpoint -> (models, fetched_at)
+        self._entries: Dict[str, Tuple[List[str], float]] = {}
+
+    def get(
+        self,
+        endpoint: str,
+        fetch: Callable[[], List[str]],
+        ttl: Optional[float] = 300.0,
+        refresh: bool = False,
+    ) -> List[str]:
+        """
+        Get the models available on the endpoint.
+
+        Args:
+            endpoint (str): Endpoint the catalog belongs to.
+            fetch (Callable): Function listing the models of the endpoint.
+            ttl (float): Seconds a fetched catalog stays valid. None to never expire.
+            refresh (bool): Fetch the catalog even if the cached one is still valid.
+        """
+        if not refresh:
+            models = self._lookup(endpoint, ttl)
+            if models is not None:
+                return models
+
+        with self._lock:
+            endpoint_lock = self._endpoint_locks.setdefault(endpoint, threading.Lock())
+
+        with endpoint_lock:
+            # Another thread may have fetched the catalog while we were waiting.
+            if not refresh:
+                models = self._lookup(endpoint, ttl)
+                if models is not None:
+                    return models
+            models = list(fetch())
+            self._entries[endpoint] = (models, time.monotonic())
+            return models
+
+    def _lookup(self, endpoint: str, ttl: Optional[float]) -> Optional[List[str]]:
+        entry = self._entries.get(endpoint)
+        if entry is None:
+            return None
+        models, fetched_at = entry
+        if ttl is not None and time.monotonic() - fetched_at > ttl:
+            return None
+        return models
+
+    def invalidate(self, endpoint: str = None) -> None:
+        """
+        Drop the cached catalog of the endpoint, or of every endpoint.
+        """
+        if endpoint is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(endpoint, None)
+
+
+model_catalog = ModelCatalog()
@@ -1,10 +1,17 @@
-import itertools
+import time
+import asyncio
+import threading
 from typing import List, Dict, Mapping, Union, Iterator, Any
 
 import ollama
 
-from ollama_prompter.parser import Parser
-from ollama_prompter.models.api.base_model import BaseModel
+from ollama_prompter.metrics.tracing import tracer
+from ollama_prompter.models.api.base_model import BaseModel, make_usage
+from ollama_prompter.models.api.connection_pool import ConnectionPool
+from ollama_prompter.models.api.model_catalog import model_catalog
+from ollama_prompter.models.api.load_balancer import EndpointState, LoadBalancer
+from ollama_prompter.models.api.residency import ResidencyPolicy
+from ollama_prompter.models.api.retry_policy import RetryPolicy
 
 
 class Ollama(BaseModel):
@@ -20,6 +27,16 @@ class Ollama(BaseModel):
         top_k (int): When decoding text, samples from the top k most likely tokens; lower to ignore less likely tokens.
         api_await (bool): Waiting time for the API to finish in seconds.
         api_retry (int): Retrying time for the API to finish.
+        pool (ConnectionPool): Settings of the HTTP connection pool reused by every request.
+        verify (str): When to verify the model against the endpoint: "eager", "lazy" (on first use) or "off".
+        catalog_ttl (float): Seconds the list of models available on the endpoint is cached, shared by every instance in the process.
+        endpoints (List[str]): Several Ollama servers serving the same model. Overrides `endpoint`; requests are load balanced over them.
+        endpoint_weights (List[float]): Relative share of the traffic of each endpoint.
+        routing (str): "least_outstanding" routes to the endpoint with the fewest in-flight requests, "weighted" picks at random by weight.
+        health_check_interval (float): Seconds between health checks of the endpoints against `/api/tags`. 0 to disable.
+        failure_threshold (int): Consecutive failed requests before an endpoint is ejected until its health check succeeds again.
+        retry_policy (RetryPolicy): Retry policy of the requests, see `BaseModel`.
+        residency (ResidencyPolicy): Keep-alive, warmup and background keeper of the model on the endpoints.
 
     Note:
         Need to run local builds for Ollama to start the server first. Ollama has a REST API for running and managing models.
@@ -44,15 +61,53 @@ class Ollama(BaseModel):
         top_k: int = 1, 
         api_await: int = 60, 
         api_retry: int = 5, 
+        pool: ConnectionPool = None, 
+        verify: str = "eager", 
+        catalog_ttl: float = 300.0, 
+        endpoints: List[str] = None, 
+        endpoint_weights: List[float] = None, 
+        routing: str = "least_outstanding", 
+        health_check_interval: float = 10.0, 
+        failure_threshold: int = 3, 
+        retry_policy: RetryPolicy = None, 
+        residency: ResidencyPolicy = None, 
     ) -> None:
-        self.endpoint = endpoint
-        self._client = ollama.Client(host=self.endpoint)
+        endpoints = endpoints or [endpoint]
+        self.endpoint = endpoints[0]
+        self.endpoints = endpoints
+        self.catalog_ttl = catalog_ttl
+        self.pool = pool or ConnectionPool()
+        self._balancer = LoadBalancer(
+            endpoints, 
+            client_factory=lambda host: ollama.Client(host=host, **self.pool.client_kwargs()), 
+            health_check=lambda state: state.client.list(), 
+            weights=endpoint_weights, 
+            strategy=routing, 
+            failure_threshold=failure_threshold, 
+            health_check_interval=health_check_interval, 
+        )
+        self._client = self._balancer.endpoints[0].client
+        if len(endpoints) > 1:
+            self._balancer.start_health_checks()
 
         self.temperature = temperature
         self.top_p = top_p
         self.top_k = top_k
         self.parameters = self.get_parameters()
-        super().__init__(api_key, model_name, api_await, api_retry)
+        self.residency = residency or ResidencyPolicy()
+        self._load_stats = {
+            state.endpoint: {"responses": 0, "cold_loads": 0, "load_seconds": 0.0, "last_cold_load": None} 
+            for state in self._balancer.endpoints
+        }
+        self._load_stats_lock = threading.Lock()
+        self._keeper_stop = threading.Event()
+        self._keeper_thread = None
+        super().__init__(api_key, model_name, api_await, api_retry, verify, retry_policy)
+
+        if self.residency.warmup:
+            self.warmup(self.residency.prefix)
+        if self.residency.keeper_interval > 0:
+            self.start_keeper()
 
     def set_key(self, api_key: str):
         """
@@ -64,21 +119,27 @@ class Ollama(BaseModel):
         """
         Verify the model is supported by the endpoint.
         """
-        SUPPORTED_MODELS = {
-            "chat_models": set(
-                [model['name'] for model in self._client.list()['models']]
-            )
-        }
-        if self.model_name not in SUPPORTED_MODELS["chat_models"]:
+        if self.model_name in self.supported_models():
+            return
+        # The model may have been pulled since the catalog was cached.
+        if self.model_name not in self.supported_models(refresh=True):
             raise ValueError(f"Unsupported model: {self.model_name}")
         
-    def supported_models(self) -> List[str]:
-        SUPPORTED_MODELS = {
-            "chat_models": set(
-                [model['name'] for model in self._client.list()['models']]
-            )
-        }
-        return list(itertools.chain(*SUPPORTED_MODELS.values()))
+    def supported_models(self, refresh: bool = False) -> List[str]:
+        # Endpoints serve the same models, so the first one that answers is enough, healthy ones first.
+        error = None
+        for state in sorted(self._balancer.endpoints, key=lambda state: not state.healthy):
+            try:
+                return model_catalog.get(
+                    state.endpoint, lambda: self._list_models(state), ttl=self.catalog_ttl, refresh=refresh
+                )
+            except Exception as e:
+                error = e
+        raise error
+
+    @staticmethod
+    def _list_models(state: EndpointState) -> List[str]:
+        return [model['name'] for model in state.client.list()['models']]
 
     def get_parameters(self):
         """
@@ -104,9 +165,11 @@ class Ollama(BaseModel):
     
     def set_model_name(self, model_name: str):
         self.model_name = model_name
-        self._verify_model()
+        self._verified = False
+        if self.verify == "eager":
+            self._ensure_verified()
 
-    def run(self, prompt: str) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
+    def run(self, prompt: str, output_schema: Dict[str, Any] = None) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
         """
         Run the LLM on the given prompt list.
         """
@@ -114,26 +177,228 @@ class Ollama(BaseModel):
             {"role": "system", "content": self.SYSTEM_MESSAGE}, 
             {"role": "user", "content": prompt}, 
         ]
-        self.parameters["messages"] = prompt_template
-        response = self._client.chat(
-            model=self.model_name, 
-            messages=prompt_template, 
-            options=self.parameters
-        )
+        with self._balancer.route() as state:
+            response = state.client.chat(
+                model=self.model_name, 
+                messages=prompt_template, 
+                options=self.parameters, 
+                format=self._format(output_schema), 
+                keep_alive=self.residency.keep_alive, 
+            )
+        self._record_response(state, response)
+        return response
+
+    @staticmethod
+    def _format(output_schema: Dict[str, Any] = None) -> str:
+        # Ollama constrains the generation to valid JSON with format="json".
+        return "json" if output_schema is not None else ""
+
+    def run_stream(self, prompt: str, output_schema: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Run the LLM on the given prompt and yield the generated text as it arrives.
+        """
+        prompt_template = [
+            {"role": "system", "content": self.SYSTEM_MESSAGE}, 
+            {"role": "user", "content": prompt}, 
+        ]
+        with self._balancer.route() as state:
+            stream = state.client.chat(
+                model=self.model_name, 
+                messages=prompt_template, 
+                options=self.parameters, 
+                stream=True, 
+                format=self._format(output_schema), 
+                keep_alive=self.residency.keep_alive, 
+            )
+            try:
+                for chunk in stream:
+                    if chunk.get('done'):
+                        self._record_response(state, chunk)
+                    content = chunk['message']['content']
+                    if content:
+                        yield content
+            finally:
+                # Closing the stream drops the connection, which stops the generation on the server.
+                stream.close()
+
+    def _get_async_client(self, state: EndpointState) -> ollama.AsyncClient:
+        """
+        Get the async client of the endpoint bound to the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if state.async_client is None or state.async_client_loop is not loop:
+            state.async_client = ollama.AsyncClient(
+                host=state.endpoint, **self.pool.client_kwargs()
+            )
+            state.async_client_loop = loop
+        return state.async_client
+
+    async def arun(self, prompt: str, output_schema: Dict[str, Any] = None) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
+        """
+        Run the LLM on the given prompt without blocking the event loop.
+        """
+        prompt_template = [
+            {"role": "system", "content": self.SYSTEM_MESSAGE}, 
+            {"role": "user", "content": prompt}, 
+        ]
+        with self._balancer.route() as state:
+            response = await self._get_async_client(state).chat(
+                model=self.model_name, 
+                messages=prompt_template, 
+                options=self.parameters, 
+                format=self._format(output_schema), 
+                keep_alive=self.residency.keep_alive, 
+            )
+        self._record_response(state, response)
         return response
+
+    @staticmethod
+    def server_timings(response: Mapping[str, Any]) -> Dict[str, float]:
+        """
+        Get the timings and token counts reported by the server in a final response.
+        Durations are in seconds; missing fields are left out.
+        """
+        timings = {}
+        for field, name in (
+            ('total_duration', "total_seconds"), 
+            ('load_duration', "load_seconds"), 
+            ('prompt_eval_duration', "prompt_eval_seconds"), 
+            ('eval_duration', "eval_seconds"), 
+        ):
+            if response.get(field) is not None:
+                timings[name] = response[field] / 1e9
+        for field, name in (('prompt_eval_count', "prompt_eval_tokens"), ('eval_count', "eval_tokens")):
+            if response.get(field) is not None:
+                timings[name] = response[field]
+        for stage in ("prompt_eval", "eval"):
+            if timings.get(f"{stage}_seconds") and f"{stage}_tokens" in timings:
+                timings[f"{stage}_tokens_per_second"] = timings[f"{stage}_tokens"] / timings[f"{stage}_seconds"]
+        return timings
+
+    def _record_response(self, state: EndpointState, response: Mapping[str, Any]):
+        """
+        Record the timings reported by the server: the model load time, which is high when
+        the model was not resident, and the prompt evaluation and generation times and rates.
+        """
+        timings = self.server_timings(response)
+        for name, value in timings.items():
+            tracer.observe(f"server_{name}", value, model=self.model_name, endpoint=state.endpoint)
+
+        load_seconds = timings.get("load_seconds", 0.0)
+        with self._load_stats_lock:
+            stats = self._load_stats[state.endpoint]
+            stats["responses"] += 1
+            stats["load_seconds"] += load_seconds
+            if load_seconds >= self.residency.cold_load_threshold:
+                stats["cold_loads"] += 1
+                stats["last_cold_load"] = {"at": time.time(), "seconds": load_seconds}
+
+    def residency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the number of responses, cold loads and total load time per endpoint.
+        """
+        with self._load_stats_lock:
+            return {endpoint: dict(stats) for endpoint, stats in self._load_stats.items()}
+
+    def warmup(self, prefix: str = None) -> Dict[str, float]:
+        """
+        Load the model on every endpoint, and evaluate the static prompt prefix if given.
+
+        Args:
+            prefix (str): Beginning shared by the prompts, e.g. `Prompter.static_prefix()`.
+                The server keeps it in its prompt cache, so later prompts starting with it
+                only evaluate their own tokens.
+
+        Returns:
+            The load time in seconds reported by each endpoint.
+        """
+        load_times = {}
+        for state in self._balancer.endpoints:
+            if prefix:
+                response = state.client.chat(
+                    model=self.model_name, 
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_MESSAGE}, 
+                        {"role": "user", "content": prefix}, 
+                    ], 
+                    options={**self.parameters, "num_predict": 1}, 
+                    keep_alive=self.residency.keep_alive, 
+                )
+            else:
+                # A request without a prompt only loads the model.
+                response = state.client.generate(model=self.model_name, keep_alive=self.residency.keep_alive)
+            self._record_response(state, response)
+            load_times[state.endpoint] = response.get('load_duration', 0) / 1e9
+        return load_times
+
+    def start_keeper(self):
+        """
+        Ping the healthy endpoints every `residency.keeper_interval` seconds from a daemon thread,
+        so the model stays loaded while the service is idle.
+        """
+        if self._keeper_thread is not None or self.residency.keeper_interval <= 0:
+            return
+        self._keeper_stop.clear()
+
+        def _loop():
+            while not self._keeper_stop.wait(self.residency.keeper_interval):
+                for state in self._balancer.endpoints:
+                    if not state.healthy:
+                        continue
+                    try:
+                        response = state.client.generate(model=self.model_name, keep_alive=self.residency.keep_alive)
+                    except Exception as e:
+                        print(f"Error in keeping {self.model_name} loaded on {state.endpoint}: {e}")
+                        continue
+                    self._record_response(state, response)
+
+        self._keeper_thread = threading.Thread(target=_loop, name="ollama-keeper", daemon=True)
+        self._keeper_thread.start()
+
+    def stop_keeper(self):
+        """
+        Stop the background keeper.
+        """
+        self._keeper_stop.set()
+        if self._keeper_thread is not None:
+            self._keeper_thread.join()
+            self._keeper_thread = None
+    
+    def endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get health, in-flight requests and latency statistics per endpoint.
+        """
+        return self._balancer.stats()
+
+    def close(self):
+        """
+        Stop the background health checks and keeper.
+        """
+        self._balancer.stop_health_checks()
+        self.stop_keeper()
     
     def model_output_raw(self, response: Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]) -> Dict:
         data = {}
         content = str(response['message']['content'])
         data["text"] = content.strip()
+        data["usage"] = self.usage(response)
         return data
+
+    def usage(self, response: Mapping[str, Any]) -> Dict[str, Any]:
+        completion_tokens = response.get('eval_count')
+        prompt_tokens = response.get('prompt_eval_count')
+        if prompt_tokens is None and completion_tokens is not None:
+            # The server leaves the count out when the whole prompt came from its prompt cache.
+            prompt_tokens = 0
+        return make_usage(prompt_tokens, completion_tokens)
     
     def model_output(
         self, 
         response: Union[Mapping[str, Any], Iterator[Mapping[str, Any]]], 
-        json_depth_limit: int
+        json_depth_limit: int, 
+        output_schema: Dict[str, Any] = None, 
     ) -> Dict:
         data = self.model_output_raw(response)
         # Try to parse the input JSON string and complete it if it is incomplete
-        data["parsed"] = Parser().fit(data["text"], json_depth_limit)
+        data["parsed"] = self.parse_text(data["text"], json_depth_limit, output_schema)
         return data
\ No newline at end of file
@@ -1,12 +1,17 @@
+import asyncio
 import itertools
-from typing import List, Dict, Tuple, Union, Optional, Any
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Tuple, Union, Optional, Iterator, Any
 
 import openai
 import tiktoken
 from openai.types.chat import ChatCompletion
 
-from ollama_prompter.parser import Parser
-from ollama_prompter.models.api.base_model import BaseModel
+from ollama_prompter.models.api.base_model import BaseModel, make_usage
+from ollama_prompter.models.api.connection_pool import ConnectionPool, close_with_loop
+from ollama_prompter.models.api.rate_limiter import RateLimiter
+from ollama_prompter.models.api.retry_policy import RetryPolicy
 
 
 class OpenAI(BaseModel):
@@ -29,6 +34,19 @@ class OpenAI(BaseModel):
             ]
         )
     }
+    # Models accepting response_format={"type": "json_object"}.
+    JSON_MODE_MODELS = frozenset(
+        [
+            "gpt-3.5-turbo-0125",
+            "gpt-3.5-turbo",
+            "gpt-3.5-turbo-1106",
+            "gpt-4-turbo",
+            "gpt-4-0125-preview",
+            "gpt-4-turbo-preview",
+            "gpt-4-1106-preview",
+            "gpt-4o",
+        ]
+    )
 
     def __init__(
         self, 
@@ -46,8 +64,25 @@ class OpenAI(BaseModel):
         request_timeout: Union[float, Tuple[float, float]] = None, 
         api_await: int = 60, 
         api_retry: int = 5, 
+        pool: ConnectionPool = None, 
+        verify: str = "eager", 
+        base_url: Optional[str] = None, 
+        requests_per_minute: Optional[float] = None, 
+        tokens_per_minute: Optional[float] = None, 
+        rate_limiter: Optional[RateLimiter] = None, 
+        completion_token_estimate: int = 256, 
+        retry_policy: RetryPolicy = None, 
     ) -> None:
-        super().__init__(api_key, model_name, api_await, api_retry)
+        self.base_url = base_url
+        if rate_limiter is None and (requests_per_minute or tokens_per_minute):
+            rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        # Shared by every thread and task using this model, pass the same limiter to models sharing a quota.
+        self.rate_limiter = rate_limiter
+        self.completion_token_estimate = completion_token_estimate
+        self.pool = pool or ConnectionPool()
+        self._client = None
+        self._client_lock = threading.Lock()
+        super().__init__(api_key, model_name, api_await, api_retry, verify, retry_policy)
         self.temperature = temperature
         self.top_p = top_p
         self.n = n
@@ -60,6 +95,9 @@ class OpenAI(BaseModel):
         self.request_timeout = request_timeout
         self._initialize_encoder()
         self.parameters = self.get_parameters()
+        self._async_client = None
+        self._async_client_loop = None
+        self._async_client_closer = None
 
     def set_key(self, api_key: str):
         """
@@ -67,6 +105,9 @@ class OpenAI(BaseModel):
         """
         self._openai = openai
         self._openai.api_key = api_key
+        # Clients hold the key, rebuild them on next use.
+        self._client = None
+        self._release_async_client()
 
     def _verify_model(self):
         """
@@ -82,7 +123,7 @@ class OpenAI(BaseModel):
         """
         Get model parameters.
         """
-        return {
+        parameters = {
             "temperature": self.temperature,
             "top_p": self.top_p,
             "n": self.n,
@@ -92,8 +133,11 @@ class OpenAI(BaseModel):
             "presence_penalty": self.presence_penalty,
             "frequency_penalty": self.frequency_penalty,
             "logit_bias": self.logit_bias,
-            "timeout": self.request_timeout,
         }
+        # An explicit timeout of None disables the timeouts of the shared client.
+        if self.request_timeout is not None:
+            parameters["timeout"] = self.request_timeout
+        return parameters
     
     def get_description(self):
         """
@@ -110,26 +154,207 @@ class OpenAI(BaseModel):
     
     def set_model_name(self, model_name: str):
         self.model_name = model_name
-        self._verify_model()
+        self._verified = False
+        if self.verify == "eager":
+            self._ensure_verified()
     
-    def run(self, prompt: str) -> ChatCompletion:
+    def _get_client(self) -> "openai.OpenAI":
+        """
+        Get the client shared by every request of this model.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._openai.OpenAI(
+                        api_key=self.api_key, 
+                        base_url=self.base_url, 
+                        http_client=self.pool.build_client(), 
+                    )
+        return self._client
+
+    def run(self, prompt: str, output_schema: Dict[str, Any] = None) -> ChatCompletion:
         """
         Run the LLM on the given prompt list.
         """
-        client = self._openai.OpenAI(api_key=self.api_key)
         prompt_template = [
             {"role": "system", "content": "You are a helpful assistant."}, 
             {"role": "user", "content": prompt}, 
         ]
         # https://community.openai.com/t/confused-about-max-tokens-parameter-with-gtp4-turbo-128k-tokenusedforprompt-or-4k/506681/2
         # self.parameters["max_tokens"] = self._calculate_max_tokens(prompt_template)
-        self.parameters["messages"] = prompt_template
-        response = client.chat.completions.create(
-            model=self.model_name, 
-            **self.parameters,
-        )
+        completions = self._get_client().chat.completions
+        if self.rate_limiter is None:
+            return completions.create(
+                model=self.model_name, 
+                messages=prompt_template, 
+                **self.parameters,
+                **self._response_format(output_schema),
+            )
+
+        reserved = self.rate_limiter.acquire(self._estimate_tokens(prompt_template))
+        with self._track_rate_limit_errors(reserved):
+            raw = completions.with_raw_response.create(
+                model=self.model_name, 
+                messages=prompt_template, 
+                **self.parameters,
+                **self._response_format(output_schema),
+            )
+        self.rate_limiter.update_from_headers(raw.headers)
+        response = raw.parse()
+        self._settle_usage(reserved, response)
+        return response
+
+    def run_stream(self, prompt: str, output_schema: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Run the LLM on the given prompt and yield the generated text as it arrives.
+        """
+        prompt_template = [
+            {"role": "system", "content": "You are a helpful assistant."}, 
+            {"role": "user", "content": prompt}, 
+        ]
+        completions = self._get_client().chat.completions
+        if self.rate_limiter is None:
+            stream = completions.create(
+                model=self.model_name, 
+                messages=prompt_template, 
+                stream=True, 
+                **self.parameters,
+                **self._response_format(output_schema),
+            )
+        else:
+            reserved = self.rate_limiter.acquire(self._estimate_tokens(prompt_template))
+            with self._track_rate_limit_errors(reserved):
+                raw = completions.with_raw_response.create(
+                    model=self.model_name, 
+                    messages=prompt_template, 
+                    stream=True, 
+                    **self.parameters,
+                    **self._response_format(output_schema),
+                )
+            self.rate_limiter.update_from_headers(raw.headers)
+            stream = raw.parse()
+
+        generated = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    generated.append(content)
+                    yield content
+        finally:
+            stream.close()
+            if self.rate_limiter is not None:
+                # Streamed chunks carry no usage, count the generated text instead.
+                actual = self._count_message_tokens(prompt_template) + len(self.encoder.encode("".join(generated)))
+                self.rate_limiter.settle(reserved, actual)
+
+    def _get_async_client(self) -> "openai.AsyncOpenAI":
+        """
+        Get the async client bound to the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._release_async_client()
+            self._async_client = self._openai.AsyncOpenAI(
+                api_key=self.api_key, 
+                base_url=self.base_url, 
+                http_client=self.pool.build_async_client(), 
+            )
+            self._async_client_loop = loop
+            # Closes the client when the loop shuts down, e.g. at the end of `asyncio.run`.
+            self._async_client_closer = close_with_loop(self._async_client.close)
+        return self._async_client
+
+    def _release_async_client(self):
+        """
+        Forget the async client, closing it on its event loop if that loop is still open.
+        """
+        closer = getattr(self, "_async_client_closer", None)
+        self._async_client = None
+        self._async_client_closer = None
+        if closer is not None and not closer.get_loop().is_closed():
+            closer.get_loop().call_soon_threadsafe(closer.cancel)
+
+    async def aclose(self):
+        """
+        Close the async client bound to the running event loop, if any.
+        """
+        closer = self._async_client_closer
+        if closer is None or closer.get_loop() is not asyncio.get_running_loop():
+            return
+        self._async_client = None
+        self._async_client_closer = None
+        closer.cancel()
+        await asyncio.gather(closer, return_exceptions=True)
+
+    async def arun(self, prompt: str, output_schema: Dict[str, Any] = None) -> ChatCompletion:
+        """
+        Run the LLM on the given prompt without blocking the event loop.
+        """
+        prompt_template = [
+            {"role": "system", "content": "You are a helpful assistant."}, 
+            {"role": "user", "content": prompt}, 
+        ]
+        completions = self._get_async_client().chat.completions
+        if self.rate_limiter is None:
+            return await completions.create(
+                model=self.model_name, 
+                messages=prompt_template, 
+                **self.parameters,
+                **self._response_format(output_schema),
+            )
+
+        reserved = await self.rate_limiter.aacquire(self._estimate_tokens(prompt_template))
+        with self._track_rate_limit_errors(reserved):
+            raw = await completions.with_raw_response.create(
+                model=self.model_name, 
+                messages=prompt_template, 
+                **self.parameters,
+                **self._response_format(output_schema),
+            )
+        self.rate_limiter.update_from_headers(raw.headers)
+        response = raw.parse()
+        self._settle_usage(reserved, response)
         return response
 
+    def _response_format(self, output_schema: Dict[str, Any] = None) -> Dict[str, Any]:
+        # JSON mode makes the model return a valid JSON object. Other models are rejected with
+        # a 400 when asked for it, and rely on the schema in the prompt and its validation.
+        if output_schema is None or self.model_name not in self.JSON_MODE_MODELS:
+            return {}
+        return {"response_format": {"type": "json_object"}}
+
+    @contextmanager
+    def _track_rate_limit_errors(self, reserved: int):
+        """
+        Feed the rate limit headers of failed requests, e.g. Retry-After on 429, to the limiter,
+        and give back the tokens reserved for them.
+        """
+        try:
+            yield
+        except BaseException as e:
+            self.rate_limiter.settle(reserved, 0)
+            if isinstance(e, self._openai.APIStatusError):
+                self.rate_limiter.update_from_headers(e.response.headers)
+            raise
+
+    def _count_message_tokens(self, messages: List[Dict[str, str]]) -> int:
+        # Each message costs a few formatting tokens on top of its content, and the reply is primed with 3 more.
+        # https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_tokens_with_tiktoken.ipynb
+        return sum(4 + len(self.encoder.encode(message["content"])) for message in messages) + 3
+
+    def _estimate_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Tokens to reserve for a request: the prompt plus the expected completion.
+        """
+        return self._count_message_tokens(messages) + self.completion_token_estimate * self.n
+
+    def _settle_usage(self, reserved: int, response: ChatCompletion):
+        if response.usage is not None:
+            self.rate_limiter.settle(reserved, response.usage.total_tokens)
+
     def _calculate_max_tokens(self, prompt: str) -> int:
         prompt_tokens = len(self.encoder.encode(str(prompt)))
         max_tokens = self._default_max_tokens(self.model_name) - prompt_tokens
@@ -149,10 +374,10 @@ class OpenAI(BaseModel):
         }
         return token_dict[model_name]
     
-    def model_output(self, response: ChatCompletion, json_depth_limit: int) -> Dict:
+    def model_output(self, response: ChatCompletion, json_depth_limit: int, output_schema: Dict[str, Any] = None) -> Dict:
         data = self.model_output_raw(response)
         # Try to parse the input JSON string and complete it if it is incomplete
-        data["parsed"] = Parser().fit(data["text"], json_depth_limit)
+        data["parsed"] = self.parse_text(data["text"], json_depth_limit, output_schema)
         return data
     
     def model_output_raw(self, response: ChatCompletion) -> Dict:
@@ -161,8 +386,13 @@ class OpenAI(BaseModel):
         assert status_code == "stop", f"The status code was {status_code}."
         content = response.choices[0].message.content
         data["text"] = content.strip()
-        # data["usage"] = dict(response.usage)
+        data["usage"] = self.usage(response)
         return data
 
+    def usage(self, response: ChatCompletion) -> Dict[str, Any]:
+        if response.usage is None:
+            return make_usage()
+        return make_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+
     def _initialize_encoder(self):
         self.encoder = tiktoken.encoding_for_model(self.model_name)
@@ -0,0 +1,169 @@
+import re
+import math
+import time
+import asyncio
+import threading
+from typing import Mapping, Optional, Tuple
+
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse a duration such as "1s", "6m0s" or "20ms" into seconds.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    matches = _DURATION.findall(value or "")
+    if not matches:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `capacity` tokens per minute.
+
+    The level may go negative: a caller reserves what it needs and then waits
+    until the bucket has refilled the deficit, so waiting callers are served
+    in order and the rate never exceeds the budget.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float, now: float) -> Tuple[float, float]:
+        """
+        Take `amount`, at most the capacity, from the bucket. Returns the seconds to wait
+        before using it and the amount actually taken.
+        """
+        self.refill(now)
+        taken = min(amount, self.capacity)
+        self.level -= taken
+        return max(0.0, -self.level / self.rate), taken
+
+
+class RateLimiter:
+    """
+    Client-side limiter over requests per minute and tokens per minute.
+
+    Callers reserve one request and an estimate of the tokens they will use
+    before sending, then `settle` the estimate against the actual usage. Rate
+    limit headers returned by the API, including `Retry-After` on 429 responses,
+    pause or tighten the limiter for every caller sharing it. One instance can be
+    shared by any number of threads and asyncio tasks.
+
+    Args:
+        requests_per_minute (float): Request budget. None for no request limit.
+        tokens_per_minute (float): Token budget. None for no token limit.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> Tuple[float, int]:
+        now = time.monotonic()
+        with self._lock:
+            wait = max(0.0, self._paused_until - now)
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now)[0])
+            if self.tokens is not None:
+                token_wait, tokens = self.tokens.reserve(tokens, now)
+                wait = max(wait, token_wait)
+            return wait, tokens
+
+    def acquire(self, tokens: int = 0) -> int:
+        """
+        Block until a request using `tokens` tokens fits in the budget.
+        Returns the tokens reserved, to pass to `settle`.
+        """
+        wait, reserved = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return reserved
+
+    async def aacquire(self, tokens: int = 0) -> int:
+        """
+        Wait, without blocking the event loop, until a request using `tokens` tokens fits in the budget.
+        Returns the tokens reserved, to pass to `settle`.
+        """
+        wait, reserved = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return reserved
+
+    def settle(self, reserved: int, actual: int):
+        """
+        Correct a reservation, as returned by `acquire`, with the number of tokens the
+        request actually used, e.g. 0 for a request that failed.
+        """
+        if self.tokens is None:
+            return
+        with self._lock:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved - actual)
+
+    def pause(self, seconds: float):
+        """
+        Hold back every request for the given number of seconds.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Align the limiter with the rate limit headers of an API response.
+
+        `Retry-After` / `retry-after-ms` pause the limiter. The remaining request and
+        token counts can only lower the local budget, since other clients may share
+        the same quota. When a quota is exhausted the limiter pauses until its reset.
+        """
+        if headers is None:
+            return
+
+        seconds = None
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            try:
+                seconds = float(retry_after_ms) / 1000
+            except ValueError:
+                # Malformed, use Retry-After or leave the wait to the retry policy.
+                pass
+        if seconds is None:
+            seconds = parse_duration(headers.get("retry-after"))
+        if seconds is not None and math.isfinite(seconds) and seconds > 0:
+            self.pause(seconds)
+
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            if bucket is not None:
+                with self._lock:
+                    bucket.refill(time.monotonic())
+                    bucket.level = min(bucket.level, remaining)
+            if remaining <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset is not None:
+                    self.pause(reset)
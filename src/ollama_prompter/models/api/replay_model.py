@@ -0,0 +1,271 @@
+import os
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ollama_prompter.models.api.base_model import BaseModel, make_usage
+
+
+_RECORD_HEADER = struct.Struct(">16sI")  # key digest, payload length
+_INDEX_HEADER = struct.Struct(">8sQQ")  # magic, number of slots, indexed data size
+_INDEX_SLOT = struct.Struct(">16sQI")  # key digest, record offset, payload length
+_INDEX_MAGIC = b"OPCASS01"
+
+
+class ReplayModel(BaseModel):
+    """
+    Record/replay model backend for deterministic offline runs.
+
+    In "record" mode every prompt is sent to the wrapped model and the generated
+    text is appended to a cassette file. In "replay" mode responses are served
+    from the cassette without touching a model server; a miss raises `KeyError`.
+    "auto" replays recorded prompts and records the others.
+
+    The cassette is an append-only data file plus an open-addressing hash table
+    (`<path>.idx`) that is memory-mapped, so each lookup is O(1) and does not load
+    the cassette into memory. The index is rebuilt on `close()` and whenever it
+    is older than the data file.
+
+    Args:
+        path (str): Path of the cassette data file.
+        model (BaseModel): Model to record from. Required in "record" and "auto" modes.
+        mode (str): "replay", "record" or "auto".
+        model_name (str): Name of the recorded model. Defaults to the wrapped model's name,
+            required without one.
+        parameters (dict): Generation parameters, only used to build prompt cache keys in replay mode.
+    """
+    name = "Replay"
+    description = "Record/replay backend serving recorded model outputs."
+    MODES = ("replay", "record", "auto")
+
+    def __init__(
+        self,
+        path: str,
+        model: BaseModel = None,
+        mode: str = "replay",
+        model_name: str = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported replay mode: {mode}")
+        if mode != "replay" and model is None:
+            raise ValueError(f"A model to record from is required in {mode} mode.")
+        if model is None and model_name is None:
+            # Records are keyed by model name, scanning the cassette for it would defeat the index.
+            raise ValueError("`model_name` is required to replay without a model.")
+        self.path = path
+        self.model = model
+        self.mode = mode
+        self.parameters = parameters or {}
+        self._lock = threading.Lock()
+        # Records appended since the index was last built: digest -> (offset, length).
+        self._pending: Dict[bytes, Tuple[int, int]] = {}
+        self._index = None
+        self._index_slots = 0
+
+        open(self.path, "ab").close()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND)
+        self._load_index()
+
+        if model is not None:
+            model_name = model_name or model.model_name
+            api_await, api_retry, retry_policy = model.api_await, model.api_retry, model.retry_policy
+        else:
+            # A miss in replay mode is final, so it is not retried.
+            api_await, api_retry, retry_policy = 0, 1, None
+        super().__init__(None, model_name, api_await, api_retry, verify="off", retry_policy=retry_policy)
+
+    def _verify_model(self):
+        """
+        Verify the model is supported by the endpoint.
+        """
+        if self.model is not None:
+            self.model._verify_model()
+
+    def set_key(self, api_key: str):
+        """
+        Set endpoint API key if needed.
+        """
+        pass
+
+    def supported_models(self) -> List[str]:
+        if self.model is not None:
+            return self.model.supported_models()
+        return [self.model_name]
+
+    def set_model_name(self, model_name: str):
+        self.model_name = model_name
+        if self.model is not None:
+            self.model.set_model_name(model_name)
+
+    def get_description(self):
+        """
+        Get model description.
+        """
+        return self.description
+
+    def get_endpoint(self):
+        """
+        Get model endpoint.
+        """
+        return self.path
+
+    def get_parameters(self):
+        """
+        Get model parameters.
+        """
+        if self.model is not None:
+            return self.model.get_parameters()
+        return self.parameters
+
+    def run(self, prompt: str, output_schema: Dict[str, Any] = None) -> Dict[str, str]:
+        """
+        Serve the prompt from the cassette, or record it from the wrapped model.
+        """
+        digest = self._digest(prompt)
+        if self.mode != "record":
+            record = self._lookup(digest, prompt)
+            if record is not None:
+                # Served without calling a model, with the usage of the recorded call.
+                usage = {**record.get("usage", make_usage()), "cached": True}
+                return {"text": record["text"], "usage": usage}
+            if self.mode == "replay":
+                raise KeyError(f"Prompt not found in cassette {self.path}")
+
+        response = self.model.run(prompt, output_schema=output_schema)
+        text = self.model.model_output_raw(response)["text"]
+        usage = self.model.usage(response)
+        self._append(digest, {"model_name": self.model_name, "prompt": prompt, "text": text, "usage": usage})
+        return {"text": text, "usage": usage}
+
+    def model_output_raw(self, response: Dict[str, str]) -> Dict:
+        return {"text": response["text"], "usage": self.usage(response)}
+
+    def model_output(self, response: Dict[str, str], json_depth_limit: int, output_schema: Dict[str, Any] = None) -> Dict:
+        data = self.model_output_from_text(response["text"], json_depth_limit, output_schema)
+        data["usage"] = self.usage(response)
+        return data
+
+    def usage(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        return response.get("usage", make_usage())
+
+    def _digest(self, prompt: str) -> bytes:
+        key = f"{self.model_name}\x00{prompt}".encode("utf-8")
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def _append(self, digest: bytes, record: Dict[str, str]):
+        payload = zlib.compress(json.dumps(record).encode("utf-8"))
+        with self._lock:
+            offset = os.fstat(self._fd).st_size
+            os.write(self._fd, _RECORD_HEADER.pack(digest, len(payload)) + payload)
+            self._pending[digest] = (offset + _RECORD_HEADER.size, len(payload))
+
+    def _lookup(self, digest: bytes, prompt: str) -> Optional[Dict[str, str]]:
+        location = self._pending.get(digest) or self._index_lookup(digest)
+        if location is None:
+            return None
+        offset, length = location
+        record = self._load_record(os.pread(self._fd, length, offset))
+        if record["prompt"] != prompt or record["model_name"] != self.model_name:
+            return None
+        return record
+
+    def _load_record(self, payload: bytes) -> Dict[str, Any]:
+        # Records are JSON, so a cassette from an untrusted source cannot run code when loaded.
+        try:
+            return json.loads(zlib.decompress(payload))
+        except (zlib.error, ValueError):
+            raise ValueError(
+                f"Cassette {self.path} holds a record that is not JSON, e.g. from an older version. Record it again."
+            )
+
+    def _index_lookup(self, digest: bytes) -> Optional[Tuple[int, int]]:
+        if self._index is None:
+            return None
+        mask = self._index_slots - 1
+        slot = int.from_bytes(digest[:8], "big") & mask
+        while True:
+            position = _INDEX_HEADER.size + slot * _INDEX_SLOT.size
+            slot_digest, offset, length = _INDEX_SLOT.unpack_from(self._index, position)
+            if length == 0:
+                return None
+            if slot_digest == digest:
+                return offset, length
+            slot = (slot + 1) & mask
+
+    def _load_index(self):
+        """
+        Memory-map the index, rebuilding it first if it does not cover the whole cassette.
+        """
+        index_path = self.path + ".idx"
+        data_size = os.fstat(self._fd).st_size
+        stale = True
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                magic, _, indexed_size = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+            stale = magic != _INDEX_MAGIC or indexed_size != data_size
+        if stale:
+            self.build_index()
+            return
+
+        with open(index_path, "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_slots = _INDEX_HEADER.unpack_from(self._index)[1]
+        self._pending.clear()
+
+    def build_index(self):
+        """
+        Rebuild the hash table index from the cassette data file.
+        """
+        with self._lock:
+            entries = {}
+            data_size = os.fstat(self._fd).st_size
+            offset = 0
+            while offset < data_size:
+                digest, length = _RECORD_HEADER.unpack(
+                    os.pread(self._fd, _RECORD_HEADER.size, offset)
+                )
+                # Later records win, like appending to a dict.
+                entries[digest] = (offset + _RECORD_HEADER.size, length)
+                offset += _RECORD_HEADER.size + length
+
+            n_slots = 8
+            while n_slots < 2 * len(entries):
+                n_slots *= 2
+            table = bytearray(_INDEX_HEADER.size + n_slots * _INDEX_SLOT.size)
+            _INDEX_HEADER.pack_into(table, 0, _INDEX_MAGIC, n_slots, data_size)
+            mask = n_slots - 1
+            for digest, (record_offset, length) in entries.items():
+                slot = int.from_bytes(digest[:8], "big") & mask
+                while _INDEX_SLOT.unpack_from(table, _INDEX_HEADER.size + slot * _INDEX_SLOT.size)[2] != 0:
+                    slot = (slot + 1) & mask
+                _INDEX_SLOT.pack_into(
+                    table, _INDEX_HEADER.size + slot * _INDEX_SLOT.size, digest, record_offset, length
+                )
+
+            index_path = self.path + ".idx"
+            with open(index_path + ".tmp", "wb") as f:
+                f.write(table)
+            os.replace(index_path + ".tmp", index_path)
+
+            if self._index is not None:
+                self._index.close()
+            with open(index_path, "rb") as f:
+                self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index_slots = n_slots
+            self._pending.clear()
+
+    def close(self):
+        """
+        Index the records appended in this session and close the cassette.
+        """
+        if self._pending:
+            self.build_index()
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        os.close(self._fd)
@@ -0,0 +1,39 @@
+from typing import Optional, Union
+
+
+class ResidencyPolicy:
+    """
+    How an Ollama model is kept loaded in the memory of the server.
+
+    Ollama unloads a model once it has been idle for its keep-alive, and the next
+    request pays the full load time. The policy sets the keep-alive sent with every
+    request, can preload the model when the `Ollama` model is created, and can run
+    a background keeper pinging the endpoints so the model stays resident between
+    bursts of traffic of a long-lived service.
+
+    Args:
+        keep_alive (Union[float, str]): How long the server keeps the model loaded after a
+            request, in seconds or as a duration such as "30m". -1 keeps it loaded until the
+            server stops. None uses the server default of 5 minutes.
+        warmup (bool): Preload the model on every endpoint when the model is created.
+        prefix (str): Static prompt prefix evaluated during warmup, so the server has it in
+            its prompt cache before the first real request.
+        keeper_interval (float): Seconds between two keep-alive pings of the background keeper.
+            0 disables the keeper.
+        cold_load_threshold (float): Load time in seconds above which a response counts as a
+            cold load in `Ollama.residency_stats`.
+    """
+
+    def __init__(
+        self,
+        keep_alive: Optional[Union[float, str]] = None,
+        warmup: bool = False,
+        prefix: Optional[str] = None,
+        keeper_interval: float = 0.0,
+        cold_load_threshold: float = 0.5,
+    ) -> None:
+        self.keep_alive = keep_alive
+        self.warmup = warmup
+        self.prefix = prefix
+        self.keeper_interval = keeper_interval
+        self.cold_load_threshold = cold_load_threshold
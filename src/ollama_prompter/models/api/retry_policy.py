@@ -0,0 +1,244 @@
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Iterable, Optional, Tuple, Type
+
+import tenacity
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling an endpoint while its circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an endpoint is down.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    raise `CircuitOpenError` without reaching the endpoint. Once `reset_timeout`
+    seconds have passed, a single call is let through as a probe: if it succeeds
+    the circuit closes, otherwise it opens again for another `reset_timeout`.
+
+    Args:
+        failure_threshold (int): Consecutive failures before the circuit opens.
+        reset_timeout (float): Seconds the circuit stays open before probing the endpoint.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raise `CircuitOpenError` unless a call may go through.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"Circuit open, retrying the endpoint in {remaining:.1f}s.")
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError("Circuit half-open, waiting for the probe request.")
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """
+        Forget a call that ended without telling anything about the endpoint, e.g. a cancelled one.
+        """
+        with self._lock:
+            self._probing = False
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of the requests made over a sliding window.
+
+    A retry is allowed while the retries of the last `window` seconds stay below
+    `min_retries` plus `ratio` times the requests of that window, so an outage
+    cannot multiply the load on the endpoint by the number of attempts.
+
+    Args:
+        ratio (float): Retries allowed per request.
+        min_retries (int): Retries always allowed per window, so low traffic can still retry.
+        window (float): Length of the sliding window in seconds.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 10.0) -> None:
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        horizon = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def record_request(self):
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        """
+        Record a retry if the budget allows it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryPolicy:
+    """
+    Retry policy shared by every request of a model.
+
+    Errors are either retryable (connection errors, timeouts, HTTP 408/409/425/429
+    and 5xx) or fatal (any other HTTP status, and the `fatal_errors` types such as
+    the `ValueError` of an unsupported model), which are raised right away. Retries
+    wait with random exponential backoff, are limited by an optional `RetryBudget`,
+    and an optional `CircuitBreaker` fails fast while the endpoint is down.
+
+    Args:
+        max_attempts (int): Attempts per request, including the first one.
+        max_wait (float): Upper bound of the wait between two attempts in seconds.
+        multiplier (float): Multiplier of the exponential backoff.
+        exp_base (float): Base of the exponential backoff.
+        fatal_errors (Tuple[Type[BaseException]]): Exception types never retried.
+        retryable_status_codes (Iterable[int]): HTTP status codes retried, besides 5xx.
+        budget (RetryBudget): Cap on the ratio of retries to requests. None for no cap.
+        breaker (CircuitBreaker): Circuit breaker of the endpoint. None to disable it.
+    """
+    FATAL_ERRORS = (AssertionError, ValueError, TypeError, KeyError, NotImplementedError, CircuitOpenError)
+    RETRYABLE_STATUS_CODES = (408, 409, 425, 429)
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        max_wait: float = 60,
+        multiplier: float = 0.3,
+        exp_base: float = 3,
+        fatal_errors: Tuple[Type[BaseException], ...] = FATAL_ERRORS,
+        retryable_status_codes: Iterable[int] = RETRYABLE_STATUS_CODES,
+        budget: Optional[RetryBudget] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.max_wait = max_wait
+        self.fatal_errors = tuple(fatal_errors)
+        self.retryable_status_codes = frozenset(retryable_status_codes)
+        self.budget = budget
+        self.breaker = breaker
+        retrying_kwargs = dict(
+            wait=tenacity.wait_random_exponential(multiplier=multiplier, exp_base=exp_base, max=max_wait),
+            stop=tenacity.stop_after_attempt(max_attempts),
+            retry=tenacity.retry_if_exception(self._should_retry),
+            reraise=True,
+        )
+        # Built once: each call gets its own retry state, statistics are thread-local.
+        self._retrying = tenacity.Retrying(**retrying_kwargs)
+        self._async_retrying = tenacity.AsyncRetrying(**retrying_kwargs)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Whether the error is transient, i.e. the same request may succeed later.
+        """
+        if isinstance(error, self.fatal_errors):
+            return False
+        if not isinstance(error, Exception):
+            # KeyboardInterrupt, CancelledError, GeneratorExit...
+            return False
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int) and status_code > 0:
+            return status_code >= 500 or status_code in self.retryable_status_codes
+        return True
+
+    def _should_retry(self, error: BaseException) -> bool:
+        if not self.is_retryable(error):
+            return False
+        return self.budget is None or self.budget.try_retry()
+
+    def _record_outcome(self, error: Optional[BaseException]):
+        if self.breaker is None:
+            return
+        if error is None:
+            self.breaker.record_success()
+        elif self.is_retryable(error):
+            self.breaker.record_failure()
+        elif isinstance(error, Exception):
+            # The endpoint answered, e.g. with a 400, or the error is on our side.
+            self.breaker.record_success()
+        else:
+            self.breaker.release()
+
+    def _attempt(self, func: Callable, *args, **kwargs) -> Any:
+        if self.breaker is not None:
+            self.breaker.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        return result
+
+    async def _aattempt(self, func: Callable, *args, **kwargs) -> Any:
+        if self.breaker is not None:
+            self.breaker.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        return result
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call `func` with the retry logic.
+        """
+        if self.budget is not None:
+            self.budget.record_request()
+        return self._retrying(self._attempt, func, *args, **kwargs)
+
+    async def acall(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Await the coroutine function `func` with the retry logic, waiting with `asyncio.sleep`.
+        """
+        if self.budget is not None:
+            self.budget.record_request()
+        return await self._async_retrying(self._aattempt, func, *args, **kwargs)
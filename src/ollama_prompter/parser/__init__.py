@@ -1 +1,2 @@
-from ollama_prompter.parser.parser import Parser
\ No newline at end of file
+from ollama_prompter.parser.parser import Parser
+from ollama_prompter.parser.incremental import IncrementalParser
\ No newline at end of file
@@ -0,0 +1,107 @@
+from typing import Any, List
+
+from ollama_prompter.parser.repair import _MISSING, _load_literal
+
+
+class IncrementalParser:
+    """
+    Push-style parser that emits the elements of a JSON list as they stream in.
+
+    Text is fed chunk by chunk. Anything before the first opening bracket is
+    skipped. When the outer structure is a list, every top-level element is
+    returned by `feed` as soon as it is complete; when it is a dict, the whole
+    dict is returned once it is closed. After the outer structure is closed,
+    `closed` is True and further input is ignored, so the caller can stop the
+    generation.
+
+    Attributes:
+        closed (bool): Whether the outer structure has been closed.
+        errors (List[str]): Top-level elements that could not be parsed.
+
+    Examples:
+        >>> parser = IncrementalParser()
+        >>> parser.feed("[{'T': 'ORG', 'E': 'FBI'}, {'T': 'LO")
+        [{'T': 'ORG', 'E': 'FBI'}]
+        >>> parser.feed("C', 'E': 'Iraq'}]")
+        [{'T': 'LOC', 'E': 'Iraq'}]
+        >>> parser.closed
+        True
+    """
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.errors: List[str] = []
+        self._outer = None
+        self._depth = 0
+        self._quote = None
+        self._escape = False
+        self._buffer: List[str] = []
+
+    @property
+    def started(self) -> bool:
+        """
+        Whether the outer structure has been opened.
+        """
+        return self._outer is not None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Feed a chunk of text and return the top-level elements it completed.
+        """
+        completed = []
+        buffer = self._buffer
+        for c in chunk:
+            if self.closed:
+                break
+
+            if self._outer is None:
+                if c == "[" or c == "{":
+                    self._outer = c
+                    self._depth = 1
+                    if c == "{":
+                        buffer.append(c)
+                continue
+
+            if self._quote is not None:
+                buffer.append(c)
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == self._quote:
+                    self._quote = None
+                continue
+
+            if c == "'" or c == '"':
+                self._quote = c
+                buffer.append(c)
+            elif c == "[" or c == "{":
+                self._depth += 1
+                buffer.append(c)
+            elif c == "]" or c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.closed = True
+                    if self._outer == "{":
+                        buffer.append(c)
+                    self._flush(completed)
+                    break
+                buffer.append(c)
+                if self._depth == 1 and self._outer == "[":
+                    self._flush(completed)
+            elif c == "," and self._depth == 1 and self._outer == "[":
+                self._flush(completed)
+            else:
+                buffer.append(c)
+        return completed
+
+    def _flush(self, completed: List[Any]) -> None:
+        text = "".join(self._buffer).strip()
+        self._buffer.clear()
+        if not text:
+            return
+        element = _load_literal(text)
+        if element is _MISSING:
+            self.errors.append(text)
+        else:
+            completed.append(element)
@@ -1,14 +1,24 @@
 import re
-import ast
 import itertools
 from operator import itemgetter
 from typing import Any, Dict, List, Union, Optional
 
+from ollama_prompter.parser.repair import _MISSING, JsonRepairEngine, _load_literal
+from ollama_prompter.parser.scanner import iter_object_spans
+
 
 class Parser:
     """
     A class to parse incomplete JSON objects and provide possible completions.
 
+    Parameters
+    ----------
+    engine : str or None, optional
+        The completion engine, either "stack" (single-pass repair, linear in the input size)
+        or "search" (brute-force search over closing sequences). Defaults to `Parser.DEFAULT_ENGINE`.
+    max_suggestions : int, optional
+        The maximum number of ranked completions returned by the "stack" engine (default is 1).
+
     Methods
     -------
     is_valid_json() -> bool:
@@ -30,8 +40,14 @@ class Parser:
         Returns a dictionary containing the element with the maximum length in the input list.
     """
 
-    def __init__(self):
-        pass
+    ENGINES = ("stack", "search")
+    DEFAULT_ENGINE = "stack"
+
+    def __init__(self, engine: Optional[str] = None, max_suggestions: int = 1):
+        self.engine = engine or self.DEFAULT_ENGINE
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unsupported parser engine: {self.engine}")
+        self._repair_engine = JsonRepairEngine(max_suggestions=max_suggestions)
 
     def is_valid_json(self, input_str: str) -> bool:
         """
@@ -179,7 +195,16 @@ class Parser:
         Union[Dict[str, Any], List[Any]]
             If the completion strings are objects, returns a dictionary with 'completion' and 'suggestions' keys.
             If the completion strings are arrays, returns a list of suggested completions.
+
+        Notes
+        -----
+        With the "stack" engine the text is scanned once and `json_depth_limit` bounds the
+        length of the closing sequence. The "search" engine tries every combination of
+        closing marks, which grows exponentially with `json_depth_limit`.
         """
+        if self.engine == "stack":
+            return self._repair_engine.repair(json_str, max_closing=json_depth_limit)
+
         candidate_marks = ["}", "]"]
         if "[" not in json_str:
             candidate_marks.remove("]")
@@ -226,8 +251,9 @@ class Parser:
                 "data": {"completion": output, "suggestions": []},
             }
         except Exception:
-            # remove tail braces or brackets to speed up searching.
-            json_str = re.sub(r"[\[\]\{\}\s]+$", "", json_str)
+            if self.engine == "search":
+                # remove tail braces or brackets to speed up searching.
+                json_str = re.sub(r"[\[\]\{\}\s]+$", "", json_str)
             try:
                 output = self.get_possible_completions(
                     json_str, json_depth_limit=json_depth_limit
@@ -278,56 +304,32 @@ class Parser:
         }
         return output_dict
 
-    def extract_complete_objects(self, string: str) -> List[Any]:
+    def extract_complete_objects(self, string: str, with_offsets: bool = False) -> List[Any]:
         """
-        Extracts all complete Python objects from a string.
+        Extracts all complete top-level Python objects from a string.
 
         Parameters
         ----------
         string : str
             The string to extract objects from.
+        with_offsets : bool, optional
+            If True, return (start, end, object) tuples instead of bare objects (default is False).
 
         Returns
         -------
         List[Any]
-            A list of all complete Python objects found in the string.
+            A list of all complete Python objects found in the string, in order of appearance.
+
+        Notes
+        -----
+        The string is scanned once, so this scales linearly on large outputs holding many
+        objects. Brackets inside quoted strings are ignored. Candidates that cannot be
+        evaluated as Python literals or JSON are skipped.
         """
-        object_regex = r"(?<!\\)(\[[^][]*?(?<!\\)\]|\{[^{}]*\})"
-
-        # The regular expression pattern matches any string starting with an opening brace or bracket,
-        # followed by any number of non-brace and non-bracket characters, and ending with a closing brace
-        # or bracket that is not preceded by an odd number of backslash escape characters.
-
-        object_strings = []
-        opening = {"{": 0, "[": 0}
-        closing = {"}": "{", "]": "["}
-        stack = []
-        start = 0
-        for match in re.finditer(object_regex, string):
-            if len(stack) == 0:
-                start = match.start()
-            stack.append(match.group(1))
-            if match.group(1)[-1] in closing:
-                opening_bracket = closing[match.group(1)[-1]]
-                opening[opening_bracket] += 1
-                if opening[opening_bracket] == len(
-                    [bracket for bracket in opening.values() if bracket != 0]
-                ):
-                    object_strings.append(string[start : match.end()])
-                    stack = []
-                    opening = {"{": 0, "[": 0}
-                    closing = {"}": "{", "]": "["}
-        if len(stack) > 0:
-            print(f"Error: Incomplete object at end of string: {stack[-1]}")
         objects = []
-        for object_string in object_strings:
-            try:
-                obj = ast.literal_eval(object_string)
-                # Use ast.literal_eval() to safely evaluate the string as a Python object.
-                objects.append(obj)
-            except (ValueError, SyntaxError) as e:
-                # If the string cannot be safely evaluated as a Python object, log an error and move on to the next object.
-                print(f"Error evaluating object string '{object_string}': {str(e)}")
-                pass
-
-        return objects
\ No newline at end of file
+        for start, end in iter_object_spans(string):
+            obj = _load_literal(string[start:end])
+            if obj is _MISSING:
+                continue
+            objects.append((start, end, obj) if with_offsets else obj)
+        return objects
@@ -0,0 +1,274 @@
+import re
+import ast
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+_MISSING = object()
+_WHITESPACE = frozenset(" \t\r\n")
+_OPENERS = {"{": "}", "[": "]"}
+_CLOSERS = frozenset("}]")
+_QUOTES = frozenset("'\"")
+# Longest complete number at the start of a token, e.g. "-1.5" in the truncated "-1.5e".
+_NUMBER_PREFIX = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_LITERALS = ("true", "false", "null", "True", "False", "None")
+
+
+class _Frame:
+    """
+    An open container on the scanner stack.
+
+    Frames are linked to their parent, so a snapshot of the whole stack is just a
+    reference to the innermost frame.
+    """
+    __slots__ = ("closer", "parent", "is_dict", "expect")
+
+    def __init__(self, opener: str, parent: Optional["_Frame"]) -> None:
+        self.closer = _OPENERS[opener]
+        self.parent = parent
+        self.is_dict = opener == "{"
+        # For dicts: "key" -> "colon" -> "value" -> "comma"; for lists: "value" -> "comma".
+        self.expect = "key" if self.is_dict else "value"
+
+
+class ScanResult:
+    """
+    Outcome of a single scan over a (possibly truncated) JSON string.
+
+    Attributes:
+        start (int): Offset of the first opening bracket.
+        end (int): Offset where scanning stopped.
+        closed (bool): Whether the top-level structure was closed.
+        frame (_Frame): Innermost open container when scanning stopped.
+        quote (str): Quote character of an unterminated string, if any.
+        escape (bool): Whether the unterminated string ends on a backslash.
+        cut_points (List[Tuple[int, _Frame]]): Offsets right after a complete value,
+            together with the stack that has to be closed at that offset.
+    """
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.end = start
+        self.closed = False
+        self.frame: Optional[_Frame] = None
+        self.quote: Optional[str] = None
+        self.escape = False
+        self.cut_points: List[Tuple[int, Optional[_Frame]]] = []
+
+
+class JsonRepairEngine:
+    """
+    Single-pass, stack-based repair of truncated JSON and Python-literal strings.
+
+    The input is scanned once while tracking open brackets, quotes and escapes.
+    Every position right after a complete value is remembered together with the
+    stack of containers still open there, so the closing sequence for any of
+    those positions is known without further search. Only a handful of
+    candidates is ever evaluated, which keeps the repair linear in the length
+    of the input.
+
+    Args:
+        max_suggestions (int): Maximum number of completions to return. Each one costs a
+            full evaluation of the candidate, so only the best completion is returned by default.
+    """
+
+    def __init__(self, max_suggestions: int = 1) -> None:
+        self.max_suggestions = max_suggestions
+
+    def scan(self, text: str) -> ScanResult:
+        """
+        Scan the text from its first opening bracket.
+
+        Raises:
+            ValueError: If the text does not contain an opening bracket.
+        """
+        starts = [i for i in (text.find("["), text.find("{")) if i != -1]
+        if not starts:
+            raise ValueError("Couldn't find a JSON object")
+
+        result = ScanResult(min(starts))
+        frame = None
+        quote = None
+        escape = False
+        in_token = False
+        token_start = 0
+
+        i = result.start
+        n = len(text)
+        while i < n:
+            c = text[i]
+
+            if quote is not None:
+                if escape:
+                    escape = False
+                elif c == "\\":
+                    escape = True
+                elif c == quote:
+                    quote = None
+                    self._complete_value(result, frame, i + 1)
+                i += 1
+                continue
+
+            if in_token:
+                if c in _WHITESPACE or c in _CLOSERS or c in ",:":
+                    in_token = False
+                    self._complete_value(result, frame, i)
+                else:
+                    i += 1
+                    continue
+
+            if c in _WHITESPACE:
+                pass
+            elif c in _QUOTES:
+                quote = c
+            elif c in _OPENERS:
+                frame = _Frame(c, frame)
+            elif c in _CLOSERS:
+                if frame is None or c != frame.closer:
+                    # Unbalanced closer, everything after it is unusable.
+                    break
+                frame = frame.parent
+                if frame is None:
+                    result.closed = True
+                    i += 1
+                    break
+                self._complete_value(result, frame, i + 1)
+            elif c == ":":
+                if frame.is_dict:
+                    frame.expect = "value"
+            elif c == ",":
+                frame.expect = "key" if frame.is_dict else "value"
+            else:
+                in_token = True
+                token_start = i
+            i += 1
+
+        if in_token:
+            # The text ends inside a token, which may be cut off, e.g. "-1.5e" or "tru".
+            end = self._complete_token_end(text, token_start, i)
+            if end is not None:
+                self._complete_value(result, frame, end)
+
+        result.end = i
+        result.frame = frame
+        result.quote = quote
+        result.escape = escape
+        return result
+
+    @staticmethod
+    def _complete_token_end(text: str, start: int, end: int) -> Optional[int]:
+        """
+        End of the last complete token in a token cut off by the end of the text, or None
+        when nothing of it is usable.
+        """
+        token = text[start:end]
+        if token in _LITERALS:
+            return end
+        if any(literal.startswith(token) for literal in _LITERALS):
+            return None
+        match = _NUMBER_PREFIX.match(token)
+        if match is not None:
+            return start + match.end()
+        if token == "-":
+            return None
+        return end
+
+    @staticmethod
+    def _complete_value(result: ScanResult, frame: _Frame, pos: int) -> None:
+        if frame.is_dict and frame.expect == "key":
+            frame.expect = "colon"
+            return
+        frame.expect = "comma"
+        result.cut_points.append((pos, frame))
+
+    @staticmethod
+    def closing_sequence(frame: Optional[_Frame]) -> str:
+        """
+        Return the brackets needed to close every container on the stack.
+        """
+        closers = []
+        while frame is not None:
+            closers.append(frame.closer)
+            frame = frame.parent
+        return "".join(closers)
+
+    def candidates(self, text: str, max_closing: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield candidate repairs of the text, most preferred first.
+
+        Candidates end on a complete value and are closed with the minimal
+        closing sequence. A dangling string value is closed and ranked first,
+        since it keeps the most content, like the longest completion of the
+        search engine. Candidates are built lazily, so only the ones actually
+        evaluated cost a copy of the text.
+        """
+        result = self.scan(text)
+        if result.closed:
+            yield text[result.start:result.end]
+            return
+
+        yielded = 0
+        # A dangling dict key cannot be completed, only a dangling value.
+        if result.quote is not None and result.frame.expect == "value":
+            closing = self.closing_sequence(result.frame)
+            if max_closing is None or len(closing) <= max_closing:
+                # Drop a trailing backslash, which would escape the closing quote.
+                end = result.end - 1 if result.escape else result.end
+                yield text[result.start:end] + result.quote + closing
+                yielded += 1
+
+        for pos, frame in reversed(result.cut_points):
+            closing = self.closing_sequence(frame)
+            if max_closing is not None and len(closing) > max_closing:
+                continue
+            yield text[result.start:pos] + closing
+            yielded += 1
+
+        if yielded == 0:
+            # Nothing inside is complete, close the bare brackets as a last resort.
+            yield text[result.start] + _OPENERS[text[result.start]]
+
+    def repair(self, text: str, max_closing: Optional[int] = None) -> Dict[str, List[Any]]:
+        """
+        Repair a truncated JSON string.
+
+        Args:
+            text (str): The (possibly truncated) JSON string.
+            max_closing (int): Maximum length of the closing sequence to consider.
+
+        Returns:
+            A dictionary with the best completion under 'completion' and the ranked
+            alternatives under 'suggestions'.
+
+        Raises:
+            ValueError: If the text cannot be repaired.
+        """
+        suggestions = []
+        # Bound the number of evaluations so malformed inputs stay linear.
+        attempts = 2 * self.max_suggestions + 1
+        for candidate in self.candidates(text, max_closing=max_closing):
+            if attempts == 0 or len(suggestions) == self.max_suggestions:
+                break
+            attempts -= 1
+            python_obj = _load_literal(candidate)
+            if python_obj is not _MISSING and python_obj not in suggestions:
+                suggestions.append(python_obj)
+
+        if not suggestions:
+            raise ValueError("Couldn't fix JSON")
+        return {"completion": suggestions[0], "suggestions": suggestions}
+
+
+def _load_literal(text: str) -> Any:
+    """
+    Load a JSON or Python literal string, returning a sentinel on failure.
+    """
+    # json fails fast on single-quoted literals, and is much faster on valid JSON.
+    try:
+        return json.loads(text)
+    except (ValueError, RecursionError):
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return _MISSING
@@ -0,0 +1,60 @@
+import re
+from typing import Iterator, Tuple
+
+
+# Only these characters can change the scanner state, everything else is skipped by the regex engine.
+_SPECIAL = re.compile(r"[\[\]{}'\"\\]")
+_PAIRS = {"]": "[", "}": "{"}
+
+
+def iter_object_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the (start, end) offsets of every top-level balanced object or array in the text.
+
+    The scan is a single pass that only visits brackets, quotes and backslashes,
+    so it is linear in the length of the text. Brackets inside quoted strings are
+    ignored and escapes are honoured. Text outside any structure, including stray
+    quotes and closing brackets in surrounding prose, is skipped. A structure with
+    a mismatched closing bracket is abandoned, and an unterminated one at the end
+    of the text is not reported.
+
+    Examples
+    --------
+    >>> list(iter_object_spans("a [1, ']'] b {'k': [2]}"))
+    [(2, 10), (13, 23)]
+    """
+    stack = []
+    start = 0
+    quote = None
+    escaped_at = -1
+
+    for match in _SPECIAL.finditer(text):
+        c = match.group()
+        i = match.start()
+
+        if quote is not None:
+            if i == escaped_at:
+                continue
+            if c == "\\":
+                escaped_at = i + 1
+            elif c == quote:
+                quote = None
+            continue
+
+        if not stack:
+            if c == "[" or c == "{":
+                stack.append(c)
+                start = i
+            continue
+
+        if c == "'" or c == '"':
+            quote = c
+        elif c == "[" or c == "{":
+            stack.append(c)
+        elif c == "]" or c == "}":
+            if stack[-1] != _PAIRS[c]:
+                stack.clear()
+                continue
+            stack.pop()
+            if not stack:
+                yield start, i + 1
@@ -0,0 +1,102 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def validate_schema(instance: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """
+    Validate an instance against the subset of JSON Schema used for output schemas.
+
+    Supports `type`, `enum`, `const`, `properties`, `required`, `additionalProperties`,
+    `items`, `minItems`, `maxItems` and `anyOf`. Other keywords are ignored.
+
+    Examples:
+        >>> schema = {"type": "object", "properties": {"C": {"enum": ["Sports", "World"]}}, "required": ["C"]}
+        >>> validate_schema({"C": "Sports"}, schema)
+        []
+        >>> validate_schema({"C": "Music"}, schema)
+        ["$.C: 'Music' is not one of ['Sports', 'World']"]
+
+    Returns:
+        The validation errors, empty if the instance is valid.
+    """
+    errors = []
+
+    expected = schema.get("type")
+    if expected is not None:
+        names = expected if isinstance(expected, list) else [expected]
+        types = tuple(t for name in names for t in _as_tuple(_TYPES.get(name, object)))
+        # bool is a subclass of int, but not a JSON number.
+        is_bool = isinstance(instance, bool) and "boolean" not in names
+        if not isinstance(instance, types) or is_bool:
+            return [f"{path}: expected {expected}, got {type(instance).__name__}"]
+
+    if "enum" in schema and instance not in schema["enum"]:
+        errors.append(f"{path}: {instance!r} is not one of {schema['enum']!r}")
+    if "const" in schema and instance != schema["const"]:
+        errors.append(f"{path}: expected {schema['const']!r}")
+
+    if "anyOf" in schema:
+        if all(validate_schema(instance, option, path) for option in schema["anyOf"]):
+            errors.append(f"{path}: does not match any of the allowed schemas")
+
+    if isinstance(instance, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in instance:
+                errors.append(f"{path}: missing required property {key!r}")
+        additional = schema.get("additionalProperties", True)
+        for key, value in instance.items():
+            if key in properties:
+                errors.extend(validate_schema(value, properties[key], f"{path}.{key}"))
+            elif additional is False:
+                errors.append(f"{path}: unexpected property {key!r}")
+            elif isinstance(additional, dict):
+                errors.extend(validate_schema(value, additional, f"{path}.{key}"))
+
+    if isinstance(instance, list):
+        if "minItems" in schema and len(instance) < schema["minItems"]:
+            errors.append(f"{path}: expected at least {schema['minItems']} items")
+        if "maxItems" in schema and len(instance) > schema["maxItems"]:
+            errors.append(f"{path}: expected at most {schema['maxItems']} items")
+        if isinstance(schema.get("items"), dict):
+            for i, item in enumerate(instance):
+                errors.extend(validate_schema(item, schema["items"], f"{path}[{i}]"))
+
+    return errors
+
+
+def _as_tuple(types) -> tuple:
+    return types if isinstance(types, tuple) else (types,)
+
+
+def parse_json_output(text: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Fast path for constrained JSON output: strict `json.loads` plus schema validation.
+
+    Returns:
+        The result in the format of `Parser.fit`, or None if the text is not valid
+        JSON or does not match the schema, in which case the caller falls back to the
+        repair engine.
+    """
+    try:
+        output = json.loads(text)
+    except ValueError:
+        return None
+    if validate_schema(output, schema):
+        return None
+    return {
+        "status": "completed",
+        "object_type": type(output),
+        "data": {"completion": output, "suggestions": []},
+    }
@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Set
+
+from ollama_prompter.prompter.prompter import Prompter
+
+
+class PromptGraph:
+    """
+    Dependency graph of the prompters of a pipeline.
+
+    A prompter depends on the prompters listed in its `depends_on` and on the
+    named prompters whose name is a variable of its template. Prompters without
+    dependencies between them can run concurrently.
+
+    Args:
+        prompters (List[Prompter]): Prompters of the pipeline.
+
+    Attributes:
+        dependencies (List[Set[int]]): Indices of the prompters each prompter depends on.
+        dependents (List[Set[int]]): Indices of the prompters depending on each prompter.
+        order (List[int]): Indices of the prompters in a topological order.
+    """
+
+    def __init__(self, prompters: List[Prompter]) -> None:
+        self.prompters = prompters
+        self.names: Dict[str, int] = {}
+        for index, prompter in enumerate(prompters):
+            if prompter.name is None:
+                continue
+            if prompter.name in self.names:
+                raise ValueError(f"Duplicate prompter name: {prompter.name}")
+            self.names[prompter.name] = index
+
+        self.dependencies: List[Set[int]] = []
+        for index, prompter in enumerate(prompters):
+            wanted = set(prompter.depends_on)
+            unknown = wanted - self.names.keys()
+            if unknown:
+                raise ValueError(f"Unknown prompters in depends_on: {sorted(unknown)}")
+            if self.names:
+                wanted |= prompter.variables() & self.names.keys()
+            self.dependencies.append({self.names[name] for name in wanted} - {index})
+
+        self.dependents: List[Set[int]] = [set() for _ in prompters]
+        for index, dependencies in enumerate(self.dependencies):
+            for dependency in dependencies:
+                self.dependents[dependency].add(index)
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[int]:
+        remaining = [len(dependencies) for dependencies in self.dependencies]
+        ready = [index for index, count in enumerate(remaining) if count == 0]
+        order = []
+        while ready:
+            # Lowest index first, so independent prompters keep their declared order.
+            index = min(ready)
+            ready.remove(index)
+            order.append(index)
+            for dependent in self.dependents[index]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) < len(self.prompters):
+            cycle = [index for index, count in enumerate(remaining) if count > 0]
+            raise ValueError(f"Prompters {cycle} have cyclic dependencies.")
+        return order
+
+    def upstream_variables(self, index: int, values: List[Any]) -> Dict[str, Any]:
+        """
+        Template variables of a prompter holding the values of the named prompters it depends on.
+        """
+        variables = {}
+        for dependency in self.dependencies[index]:
+            name = self.prompters[dependency].name
+            if name is not None:
+                variables[name] = values[dependency]
+        return variables
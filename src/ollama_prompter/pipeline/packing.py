@@ -0,0 +1,151 @@
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from ollama_prompter.models.api.base_model import make_usage
+from ollama_prompter.parser.schema import validate_schema
+from ollama_prompter.prompter.prompter import Prompter, schema_instruction
+
+
+PACKING_INSTRUCTIONS = """
+The input above holds {n} texts, numbered [1] to [{n}]. Apply the task to each text independently.
+Answer with a single JSON object mapping each number to the output for that text, in the requested output format, e.g. {{"1": <output for [1]>, "2": <output for [2]>}}.
+Include every number from 1 to {n} and nothing else."""
+
+
+def approximate_tokens(text: str) -> int:
+    """
+    Rough token count of English text, about four characters per token.
+    """
+    return len(text) // 4 + 1
+
+
+class PromptPacker:
+    """
+    Packs several inputs into one prompt and splits the reply back into one output per input.
+
+    The template of the prompter is rendered once with the inputs numbered as
+    `[1] ...`, `[2] ...` in place of the text, followed by instructions asking for a
+    JSON object keyed by these numbers. The static part of the prompt, such as
+    instructions, labels and examples, is then sent once per pack instead of once
+    per input.
+
+    Args:
+        max_items (int): Maximum number of inputs in one prompt.
+        token_budget (int): Maximum number of prompt tokens of a pack. None for no limit.
+        count_tokens (Callable): Counts the tokens of a string. Defaults to `approximate_tokens`.
+        instructions (str): Packing instructions appended to the prompt, formatted with `n`.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 8,
+        token_budget: Optional[int] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        instructions: str = PACKING_INSTRUCTIONS,
+    ) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1.")
+        self.max_items = max_items
+        self.token_budget = token_budget
+        self.count_tokens = count_tokens or approximate_tokens
+        self.instructions = instructions
+
+    @staticmethod
+    def _slot(number: int, text: str) -> str:
+        return f"[{number}] {text.strip()}"
+
+    def batches(self, prompter: Prompter, texts: Dict[int, str], variables: Dict[str, Any]) -> List[List[int]]:
+        """
+        Group the inputs, keyed by their index, into packs that fit `max_items` and `token_budget`.
+        An input that does not fit the budget on its own gets a pack of its own.
+        """
+        static_tokens = self.count_tokens(self.pack(prompter, [], variables))
+        batches, batch, batch_tokens = [], [], static_tokens
+        for index, text in texts.items():
+            tokens = self.count_tokens(self._slot(len(batch) + 1, text)) + 1
+            over_budget = self.token_budget is not None and batch_tokens + tokens > self.token_budget
+            if batch and (len(batch) == self.max_items or over_budget):
+                batches.append(batch)
+                batch, batch_tokens = [], static_tokens
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def output_schema(prompter: Prompter) -> Optional[Dict[str, Any]]:
+        """
+        Schema of the reply to a pack: an object mapping slot numbers to outputs following
+        the schema of the prompter. None when the prompter has no schema.
+        """
+        if prompter.output_schema is None:
+            return None
+        return {"type": "object", "additionalProperties": prompter.output_schema}
+
+    def pack(self, prompter: Prompter, texts: List[str], variables: Dict[str, Any]) -> str:
+        """
+        Render one prompt holding every text in a numbered slot.
+        """
+        block = "\n\n".join(self._slot(number, text) for number, text in enumerate(texts, start=1))
+        prompt = prompter.render(block, **variables) + "\n" + self.instructions.format(n=len(texts))
+        output_schema = self.output_schema(prompter)
+        if output_schema is not None:
+            # Asks for the wrapper object, not the single output the prompter would ask for.
+            prompt += schema_instruction(output_schema)
+        return prompt
+
+    def unpack(self, output: Dict[str, Any], n: int, prompter: Prompter) -> Dict[int, Dict[str, Any]]:
+        """
+        Split the parsed reply of a pack of `n` inputs into outputs keyed by slot number,
+        shaped like the output of a single prompt. Missing slots are left out, and so are
+        values not matching the schema of the prompter. Empty values, e.g. no entities
+        found, are valid outputs.
+
+        The tokens of the pack are counted once, on the pack, so the usage of each slot
+        only carries whether the pack was served from the cache.
+        """
+        usage = make_usage(cached=output.get("usage", make_usage())["cached"])
+        parsed = output["parsed"]
+        if parsed["status"] != "completed":
+            return {}
+        completion = parsed["data"]["completion"]
+        candidates = completion if isinstance(completion, list) else [completion]
+
+        slots = {}
+        for candidate in candidates:
+            if not isinstance(candidate, dict):
+                continue
+            for key, value in candidate.items():
+                try:
+                    number = int(str(key).strip().strip("[]"))
+                except ValueError:
+                    continue
+                if 1 <= number <= n and self._valid_slot(value, prompter):
+                    slots[number] = slot_output(value, usage)
+        return slots
+
+    @staticmethod
+    def _valid_slot(value: Any, prompter: Prompter) -> bool:
+        if prompter.output_schema is None:
+            return True
+        return not validate_schema(value, prompter.output_schema)
+
+
+def slot_output(value: Any, usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Output of one slot, in the format of `BaseModel.model_output`.
+    """
+    try:
+        text = json.dumps(value)
+    except (TypeError, ValueError):
+        text = str(value)
+    return {
+        "text": text,
+        "parsed": {
+            "status": "completed",
+            "object_type": type(value),
+            "data": {"completion": value, "suggestions": []},
+        },
+        "usage": dict(usage or make_usage()),
+    }
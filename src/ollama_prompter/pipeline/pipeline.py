@@ -1,14 +1,30 @@
 import os
+import time
+import asyncio
+import weakref
+import contextvars
+from collections import deque
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from tqdm.auto import tqdm
 
-from ollama_prompter.models.api.base_model import BaseModel
+from ollama_prompter.metrics.tracing import tracer
+from ollama_prompter.models.api.base_model import BaseModel, make_usage
+from ollama_prompter.parser import IncrementalParser
+from ollama_prompter.pipeline.graph import PromptGraph
+from ollama_prompter.pipeline.packing import PromptPacker
+from ollama_prompter.pipeline.single_flight import SingleFlight
+from ollama_prompter.pipeline.usage import UsageStats
 from ollama_prompter.prompter.prompter import Prompter
-from ollama_prompter.prompter.prompt_cache import PromptCache
+from ollama_prompter.prompter.prompt_cache import CacheBackend, PromptCache, make_cache_key
 
 
+# Usage of the latest run of each pipeline, per thread or asyncio task, so concurrent runs
+# of one pipeline do not overwrite each other's numbers.
+_last_run_usage: contextvars.ContextVar = contextvars.ContextVar("ollama_prompter_run_usage", default=None)
+
 class Pipeline:
 
     def __init__(
@@ -19,13 +35,32 @@ class Pipeline:
         **kwargs
     ):
         self.prompters = prompters
+        self.graph = PromptGraph(prompters)
+        # Prompters of one input run one after another unless concurrency is asked for,
+        # so a single local server does not get several requests per input by default.
+        self.prompter_workers = kwargs.get("prompter_workers", 1)
         self.model = model
         self.json_depth_limit: int = kwargs.get("json_depth_limit", 20)
         self.cache_prompt = kwargs.get("cache_prompt", True)
         self.cache_size = kwargs.get("cache_size", 200)
-        self.prompt_cache = PromptCache(self.cache_size)
+        self.prompt_cache: CacheBackend = kwargs.get("cache_backend")
+        if self.prompt_cache is None:
+            self.prompt_cache = PromptCache(
+                self.cache_size, 
+                max_bytes=kwargs.get("cache_max_bytes"), 
+                ttl=kwargs.get("cache_ttl"), 
+            )
         self.conversation_path = kwargs.get("output_path", Path.cwd())
         self.structured_output = structured_output
+        self.stream_early_stop = kwargs.get("stream_early_stop", True)
+        # Identical prompts in flight at the same time are sent once. Without the prompt
+        # cache every call is fresh by default, e.g. to sample several generations.
+        self.coalesce_requests = kwargs.get("coalesce_requests", self.cache_prompt)
+        self._in_flight = SingleFlight()
+        # Token usage per prompter over the lifetime of the pipeline, see `last_run_usage`
+        # for the latest call.
+        self.usage = UsageStats()
+        self._latest_run_usage = UsageStats()
 
         self.model_args_count = self.model.run.__code__.co_argcount
         self.model_variables = self.model.run.__code__.co_varnames[
@@ -47,50 +82,572 @@ class Pipeline:
          - Cache the response
          - Logs the conversation
          - Returns the output
+
+        Prompters run as a DAG: a prompter whose template uses the name of another
+        prompter receives that prompter's parsed output as the variable and runs
+        after it. Prompters run one at a time, unless the pipeline was created with
+        `prompter_workers` above 1, in which case independent prompters run concurrently
+        on up to that many threads. Outputs are returned in the order of `self.prompters`.
+        """
+        run_usage = self._start_run()
+        with tqdm(total=len(self.prompters)) as progress_bar:
+            return self._run_graph(text, kwargs, progress_bar=progress_bar, run_usage=run_usage)
+
+    @property
+    def last_run_usage(self) -> UsageStats:
+        """
+        Usage of the latest call made from the current thread or asyncio task, so runs
+        in other threads or tasks at the same time do not leak into it. Calls made in
+        another context, e.g. through `asyncio.run`, fall back to the latest call of
+        any context.
+        """
+        runs = _last_run_usage.get()
+        usage = runs.get(self) if runs is not None else None
+        return usage if usage is not None else self._latest_run_usage
+
+    def _start_run(self) -> UsageStats:
+        run_usage = UsageStats()
+        # Copied rather than mutated, as the mapping may be shared with other contexts.
+        runs = weakref.WeakKeyDictionary(_last_run_usage.get() or {})
+        runs[self] = run_usage
+        _last_run_usage.set(runs)
+        self._latest_run_usage = run_usage
+        return run_usage
+
+    def usage_summary(self, last_run: bool = False) -> Dict[str, Any]:
+        """
+        Get the token usage, as {'total': ..., 'by_prompter': ...}, since the pipeline was
+        created or, with `last_run=True`, of the latest call to `fit`, `fit_many`, `fit_packed`,
+        `stream`, `afit` or `amap` made from the current thread or asyncio task. Prompters are keyed by name, or by template name.
+
+        Each entry counts the requests, the model calls and the prompt and completion tokens
+        they cost, and the results served from the prompt cache or shared with an identical
+        request in flight, with the tokens they saved.
+        """
+        return (self.last_run_usage if last_run else self.usage).summary()
+
+    def warmup(self, **kwargs) -> None:
+        """
+        Preload the model before the first request, evaluating the static prefix of each
+        prompter rendered with the template variables `kwargs`. Models without a `warmup`
+        method are left as they are.
+        """
+        warmup = getattr(self.model, "warmup", None)
+        if warmup is None:
+            return
+        for prompter in self.prompters:
+            warmup(prompter.static_prefix(**kwargs))
+
+    def _generate_prompt(self, index: int, text: str, kwargs: Dict[str, Any], outputs: List[Any]) -> str:
+        variables = {**kwargs, **self.graph.upstream_variables(index, self._output_values(outputs))}
+        try:
+            prompt = self.prompters[index].generate(text, **variables)
+        except ValueError as e:
+            raise ValueError(f"Error in generating prompt: {e}")
+
+        if kwargs.get("verbose", False):
+            print(prompt)
+        return prompt
+
+    def _output_values(self, outputs: List[Any]) -> List[Any]:
+        """
+        Values of the outputs as seen by downstream templates: the parsed object with
+        structured output, or the generated text when it could not be parsed.
+        """
+        if not self.structured_output:
+            return outputs
+        return [output_value(output) if output is not None else None for output in outputs]
+
+    def _run_graph(
+        self, 
+        text: str, 
+        kwargs: Dict[str, Any], 
+        raise_errors: bool = False, 
+        concurrent: bool = True, 
+        progress_bar: Optional[tqdm] = None, 
+        run_usage: Optional[UsageStats] = None, 
+    ) -> Optional[List[Any]]:
         """
-        outputs_list = []
-        for prompter in tqdm(self.prompters):
+        Run every prompter once its dependencies are done. Returns None as soon as one of them fails.
+        """
+        outputs = [None] * len(self.prompters)
+
+        def _run_node(index: int, submitted_at: float = None):
+            if submitted_at is not None:
+                tracer.record_span("queue", time.perf_counter() - submitted_at)
+            prompt = self._generate_prompt(index, text, kwargs, outputs)
+            prompter = self.prompters[index]
+            return self._get_output_from_cache_or_model(
+                prompt, 
+                raise_errors=raise_errors, 
+                output_schema=prompter.output_schema, 
+                usage_key=usage_key(prompter), 
+                run_usage=run_usage, 
+            )
+
+        if not concurrent or len(self.prompters) < 2 or self.prompter_workers < 2:
+            for index in self.graph.order:
+                outputs[index] = _run_node(index)
+                if outputs[index] is None:
+                    return None
+                if progress_bar is not None:
+                    progress_bar.update(1)
+            return outputs
+
+        remaining = [len(dependencies) for dependencies in self.graph.dependencies]
+        with ThreadPoolExecutor(max_workers=self.prompter_workers) as executor:
+            running = {
+                executor.submit(_run_node, index, time.perf_counter()): index 
+                for index, count in enumerate(remaining) if count == 0
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    outputs[index] = future.result()
+                    if outputs[index] is None:
+                        for other in running:
+                            other.cancel()
+                        return None
+                    if progress_bar is not None:
+                        progress_bar.update(1)
+                    for dependent in self.graph.dependents[index]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            running[executor.submit(_run_node, dependent, time.perf_counter())] = dependent
+        return outputs
+
+    def stream(self, text: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Processes an input text through the pipeline while streaming the generation.
+
+        For each prompter, yields {'index': i, 'text': chunk} for every chunk of
+        generated text, followed by {'index': i, 'output': output} once the
+        generation is complete. Closing the iterator cancels the running generation.
+        With structured output, cached prompts are served as a single chunk.
+
+        With structured output, every top-level element of a JSON list is also yielded
+        as {'index': i, 'element': element} as soon as it is complete. Once the outer
+        structure is closed the generation is stopped, unless the pipeline was created
+        with `stream_early_stop=False`.
+
+        Opening a stream goes through the retry policy of the model, but a generation
+        failing after its first chunk is not retried, as the chunks were already yielded.
+        """
+        # Unstructured outputs of `fit` are raw responses, which cannot be replayed as text.
+        use_cache = self.cache_prompt and self.structured_output
+        run_usage = self._start_run()
+        outputs = [None] * len(self.prompters)
+        # Prompters stream one at a time, in an order where dependencies come first.
+        for index in self.graph.order:
+            prompt = self._generate_prompt(index, text, kwargs, outputs)
+            output_schema = self.prompters[index].output_schema
+
+            cache_key = make_cache_key(self.model, prompt, output_schema) if use_cache else None
+            output = self.prompt_cache.get(cache_key) if use_cache else None
+            if output is not None:
+                output = self._record_usage(output, True, usage_key(self.prompters[index]), run_usage)
+                yield {"index": index, "text": output["text"]}
+                for element in IncrementalParser().feed(output["text"]):
+                    yield {"index": index, "element": element}
+                outputs[index] = output
+                yield {"index": index, "output": output}
+                continue
+
+            chunks = []
+            parser = IncrementalParser() if self.structured_output else None
+            generation = self.model.execute_stream_with_retry(prompt, **schema_kwargs(output_schema))
             try:
-                prompt = prompter.generate(text, **kwargs)
-            except ValueError as e:
-                raise ValueError(f"Error in generating prompt: {e}")
+                for chunk in generation:
+                    chunks.append(chunk)
+                    yield {"index": index, "text": chunk}
+                    if parser is None:
+                        continue
+                    for element in parser.feed(chunk):
+                        yield {"index": index, "element": element}
+                    if parser.closed and self.stream_early_stop:
+                        break
+            finally:
+                # Stops the generation on early stop or when the caller cancels.
+                generation.close()
+
+            if self.structured_output:
+                output = self.model.model_output_from_text(
+                    "".join(chunks), json_depth_limit=self.json_depth_limit, output_schema=output_schema
+                )
+            else:
+                output = {"text": "".join(chunks), "usage": make_usage()}
+
+            if use_cache:
+                self.prompt_cache.add(cache_key, output)
+            # Streamed generations do not report token counts, only the request is counted.
+            self.usage.add(usage_key(self.prompters[index]), output["usage"])
+            run_usage.add(usage_key(self.prompters[index]), output["usage"])
+            outputs[index] = output
+            yield {"index": index, "output": output}
+
+    def fit_many(
+        self, 
+        records: Iterable[Union[str, Dict[str, Any]]], 
+        workers: int = 4, 
+        ordered: bool = True, 
+        max_in_flight: int = None, 
+        **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processes many records through the pipeline on a thread pool and streams the results.
+
+        A record is either the input text or a dictionary holding the text under 'text'
+        and template variables that override `kwargs`. At most `max_in_flight` records
+        (default twice the number of workers) are pulled from `records` ahead of the
+        consumer, so memory stays flat on arbitrarily long inputs.
+
+        Yields dictionaries with keys 'index' (position of the record in the input),
+        'output' (the list returned by `fit`, or None) and 'error' (the exception raised
+        while processing the record, or None). With `ordered=False` results are yielded
+        as soon as they complete.
+        """
+        max_in_flight = max_in_flight or 2 * workers
+        run_usage = self._start_run()
+        total = len(records) if hasattr(records, "__len__") else None
+        records = iter(enumerate(records))
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor, tqdm(total=total) as progress_bar:
+
+            def _submit() -> bool:
+                try:
+                    index, record = next(records)
+                except StopIteration:
+                    return False
+                pending.append(
+                    executor.submit(self._fit_record, index, record, kwargs, time.perf_counter(), run_usage)
+                )
+                return True
+
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_in_flight:
+                    exhausted = not _submit()
+                if not pending:
+                    break
+
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    future = next(f for f in pending if f in done)
+                    pending.remove(future)
+
+                progress_bar.update(1)
+                yield future.result()
+
+    def _fit_record(
+        self, 
+        index: int, 
+        record: Union[str, Dict[str, Any]], 
+        kwargs: Dict[str, Any], 
+        submitted_at: float = None, 
+        run_usage: Optional[UsageStats] = None, 
+    ) -> Dict[str, Any]:
+        if submitted_at is not None:
+            tracer.record_span("queue", time.perf_counter() - submitted_at)
+        if isinstance(record, dict):
+            record = dict(record)
+            text = record.pop("text")
+            variables = {**kwargs, **record}
+        else:
+            text = record
+            variables = kwargs
+
+        try:
+            # Records already run concurrently, so the prompters of a record run one after another.
+            outputs_list = self._run_graph(
+                text, variables, raise_errors=True, concurrent=False, run_usage=run_usage
+            )
+        except Exception as e:
+            return {"index": index, "output": None, "error": e}
+
+        return {"index": index, "output": outputs_list, "error": None}
+
+    def fit_packed(
+        self, 
+        texts: List[str], 
+        max_items: int = 8, 
+        token_budget: int = None, 
+        max_rounds: int = 2, 
+        workers: int = 4, 
+        **kwargs
+    ) -> List[Any]:
+        """
+        Processes many short texts, packing up to `max_items` of them into each prompt.
 
-            if kwargs.get("verbose", False):
-                print(prompt)
+        Each prompt holds the inputs in numbered slots, up to `token_budget` prompt tokens
+        (counted with the model's tokenizer when it has one), and the reply is split back
+        into one output per input. Inputs whose slot is missing or malformed are packed
+        again, for at most `max_rounds` rounds in total, and the remaining ones are sent one
+        prompt each. Packs run on `workers` threads.
 
-            output = self._get_output_from_cache_or_model(prompt)
+        Returns one entry per text, shaped like the result of `fit`, or None when an output
+        could not be obtained.
+        """
+        if not self.structured_output:
+            raise ValueError("Packing requires structured output to split the replies.")
+        if any(self.graph.dependencies):
+            raise ValueError("Packing does not support prompters depending on each other.")
+
+        encoder = getattr(self.model, "encoder", None)
+        packer = PromptPacker(
+            max_items=max_items, 
+            token_budget=token_budget, 
+            count_tokens=(lambda string: len(encoder.encode(string))) if encoder is not None else None, 
+        )
+        results = [[None] * len(self.prompters) for _ in texts]
+        run_usage = self._start_run()
+
+        def _fit_pack(prompter: Prompter, pack: List[str]) -> Dict[int, Any]:
+            # The reply maps slot numbers to outputs, each following the prompter's schema.
+            output_schema = packer.output_schema(prompter)
+            # Usage is counted per packed request, not per input.
+            output = self._get_output_from_cache_or_model(
+                packer.pack(prompter, pack, kwargs), 
+                output_schema=output_schema, 
+                usage_key=usage_key(prompter), 
+                run_usage=run_usage, 
+            )
             if output is None:
+                return {}
+            return packer.unpack(output, len(pack), prompter)
+
+        def _fit_single(prompter: Prompter, text: str) -> Any:
+            return self._get_output_from_cache_or_model(
+                prompter.generate(text, **kwargs), 
+                output_schema=prompter.output_schema, 
+                usage_key=usage_key(prompter), 
+                run_usage=run_usage, 
+            )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for prompter_index, prompter in enumerate(tqdm(self.prompters)):
+                pending = dict(enumerate(texts))
+                for _ in range(max_rounds):
+                    if not pending:
+                        break
+                    batches = packer.batches(prompter, pending, kwargs)
+                    packs = [[pending[index] for index in batch] for batch in batches]
+                    for batch, slots in zip(batches, executor.map(lambda pack: _fit_pack(prompter, pack), packs)):
+                        for number, index in enumerate(batch, start=1):
+                            if number in slots:
+                                results[index][prompter_index] = slots[number]
+                                del pending[index]
+
+                indices = list(pending)
+                outputs = executor.map(lambda index: _fit_single(prompter, texts[index]), indices)
+                for index, output in zip(indices, outputs):
+                    results[index][prompter_index] = output
+
+        return [None if any(output is None for output in outputs) else outputs for outputs in results]
+
+    async def afit(self, text: str, **kwargs) -> Any:
+        """
+        Async counterpart of `fit`. The prompt cache is consulted before any
+        network I/O, and the model is called through `aexecute_with_retry`.
+        Independent prompters of the DAG run as tasks, at most `prompter_workers`
+        of them at a time.
+        """
+        return await self._afit(text, kwargs, self._start_run())
+
+    async def _afit(self, text: str, kwargs: Dict[str, Any], run_usage: UsageStats) -> Any:
+        outputs = [None] * len(self.prompters)
+        tasks: Dict[int, asyncio.Task] = {}
+        semaphore = asyncio.Semaphore(max(1, self.prompter_workers))
+
+        async def _run_node(index: int):
+            dependencies = [tasks[dependency] for dependency in self.graph.dependencies[index]]
+            if not all(await asyncio.gather(*dependencies)):
                 return None
+            async with semaphore:
+                prompt = self._generate_prompt(index, text, kwargs, outputs)
+                prompter = self.prompters[index]
+                outputs[index] = await self._aget_output_from_cache_or_model(
+                    prompt, 
+                    output_schema=prompter.output_schema, 
+                    usage_key=usage_key(prompter), 
+                    run_usage=run_usage, 
+                )
+            return outputs[index] is not None
 
-            outputs_list.append(output)
+        # Dependencies come first in the topological order, so their tasks exist.
+        for index in self.graph.order:
+            tasks[index] = asyncio.ensure_future(_run_node(index))
+        try:
+            done = await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
 
-        return outputs_list
+        if not all(done):
+            return None
+        return outputs
 
-    def _get_output_from_cache_or_model(self, prompt):
+    async def amap(self, texts: Iterable[str], concurrency: int = 4, **kwargs) -> List[Any]:
+        """
+        Runs `afit` over many texts with at most `concurrency` of them in flight.
+        Results are returned in the order of the input texts.
+        """
+        semaphore = asyncio.BoundedSemaphore(concurrency)
+        run_usage = self._start_run()
+
+        async def _fit(text):
+            async with semaphore:
+                return await self._afit(text, kwargs, run_usage)
+
+        return await asyncio.gather(*[_fit(text) for text in texts])
+
+    def _get_output_from_cache_or_model(
+        self, 
+        prompt, 
+        raise_errors: bool = False, 
+        output_schema=None, 
+        usage_key: str = None, 
+        run_usage: UsageStats = None, 
+    ):
         output = None
+        cached = True
 
+        cache_key = None
+        if self.cache_prompt or self.coalesce_requests:
+            cache_key = make_cache_key(self.model, prompt, output_schema)
         if self.cache_prompt:
-            output = self.prompt_cache.get(prompt)
+            with tracer.span("cache_lookup") as span:
+                output = self.prompt_cache.get(cache_key)
+                span.set_attribute("hit", output is not None)
 
         if output is None:
             try:
-                response = self.model.execute_with_retry(prompt=prompt)
+                if self.coalesce_requests:
+                    # Concurrent callers of the same prompt share a single model call.
+                    def _call():
+                        nonlocal cached
+                        cached = False
+                        return self._get_output_from_model(prompt, cache_key, output_schema)
+
+                    output = self._in_flight.do(cache_key, _call)
+                else:
+                    cached = False
+                    output = self._get_output_from_model(prompt, cache_key, output_schema)
             except Exception as e:
+                if raise_errors:
+                    raise
                 print(f"Error in model execution: {e}")
                 return None
 
-            if self.structured_output:
+        return self._record_usage(output, cached, usage_key, run_usage)
+
+    def _get_output_from_model(self, prompt, cache_key, output_schema=None):
+        with tracer.span("model_call", model=self.model.model_name):
+            response = self.model.execute_with_retry(prompt=prompt, **schema_kwargs(output_schema))
+
+        if self.structured_output:
+            with tracer.span("parse"):
                 output = self.model.model_output(
-                    response, json_depth_limit=self.json_depth_limit
+                    response, json_depth_limit=self.json_depth_limit, **schema_kwargs(output_schema)
                 )
-            else:
-                output = response
+        else:
+            output = response
+
+        if self.cache_prompt:
+            self.prompt_cache.add(cache_key, output)
+        return output
+
+    async def _aget_output_from_cache_or_model(
+        self, 
+        prompt, 
+        output_schema=None, 
+        usage_key: str = None, 
+        run_usage: UsageStats = None, 
+    ):
+        output = None
+        cached = True
+
+        cache_key = None
+        if self.cache_prompt or self.coalesce_requests:
+            cache_key = make_cache_key(self.model, prompt, output_schema)
+        if self.cache_prompt:
+            with tracer.span("cache_lookup") as span:
+                output = self.prompt_cache.get(cache_key)
+                span.set_attribute("hit", output is not None)
 
-            if self.cache_prompt:
-                self.prompt_cache.add(prompt, output)
+        if output is None:
+            try:
+                if self.coalesce_requests:
+                    def _call():
+                        nonlocal cached
+                        cached = False
+                        return self._aget_output_from_model(prompt, cache_key, output_schema)
 
+                    output = await self._in_flight.ado(cache_key, _call)
+                else:
+                    cached = False
+                    output = await self._aget_output_from_model(prompt, cache_key, output_schema)
+            except Exception as e:
+                print(f"Error in model execution: {e}")
+                return None
+
+        return self._record_usage(output, cached, usage_key, run_usage)
+
+    def _record_usage(self, output, cached: bool, usage_key: str = None, run_usage: UsageStats = None):
+        """
+        Add the usage of an output to the statistics. Structured outputs served from the
+        cache, or shared with another caller, are returned as a copy flagged as cached.
+        """
+        if self.structured_output:
+            usage = output.get("usage") or make_usage()
+        else:
+            usage = self.model.usage(output)
+        if cached and not usage["cached"]:
+            usage = {**usage, "cached": True}
+            if self.structured_output:
+                output = {**output, "usage": usage}
+
+        if usage_key is not None:
+            self.usage.add(usage_key, usage)
+            if run_usage is not None:
+                run_usage.add(usage_key, usage)
+        return output
+
+    async def _aget_output_from_model(self, prompt, cache_key, output_schema=None):
+        with tracer.span("model_call", model=self.model.model_name):
+            response = await self.model.aexecute_with_retry(prompt=prompt, **schema_kwargs(output_schema))
+
+        if self.structured_output:
+            with tracer.span("parse"):
+                output = self.model.model_output(
+                    response, json_depth_limit=self.json_depth_limit, **schema_kwargs(output_schema)
+                )
+        else:
+            output = response
+
+        if self.cache_prompt:
+            self.prompt_cache.add(cache_key, output)
         return output
     
 
+def schema_kwargs(output_schema: Dict[str, Any] = None) -> Dict[str, Any]:
+    # Only pass the schema when there is one, so models predating output schemas keep working.
+    return {"output_schema": output_schema} if output_schema is not None else {}
+
+
+def usage_key(prompter: Prompter) -> str:
+    return prompter.name or prompter.template_name
+
+
+def output_value(output: Dict[str, Any]) -> Any:
+    parsed = output["parsed"]
+    if parsed["status"] == "completed":
+        return parsed["data"]["completion"]
+    return output["text"]
+
+
 def is_string_or_digit(obj):
     return isinstance(obj, (str, int, float))
\ No newline at end of file
@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Dict, Optional
+
+
+_FIELDS = (
+    "requests",
+    "model_calls",
+    "cached",
+    "prompt_tokens",
+    "completion_tokens",
+    "saved_prompt_tokens",
+    "saved_completion_tokens",
+)
+
+
+class UsageStats:
+    """
+    Token usage aggregated per prompter.
+
+    Each result counts as a request. Results that needed a model call add their
+    tokens to `prompt_tokens` and `completion_tokens`; results served from the
+    prompt cache, or shared with an identical request in flight, count as `cached`
+    and add the tokens they would have cost to the `saved_*` fields.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_prompter: Dict[str, Dict[str, int]] = {}
+
+    def add(self, key: str, usage: Optional[Dict[str, Any]]):
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+        with self._lock:
+            entry = self._by_prompter.get(key)
+            if entry is None:
+                entry = self._by_prompter[key] = dict.fromkeys(_FIELDS, 0)
+            entry["requests"] += 1
+            if usage.get("cached"):
+                entry["cached"] += 1
+                entry["saved_prompt_tokens"] += prompt_tokens
+                entry["saved_completion_tokens"] += completion_tokens
+            else:
+                entry["model_calls"] += 1
+                entry["prompt_tokens"] += prompt_tokens
+                entry["completion_tokens"] += completion_tokens
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the totals and the usage per prompter.
+        """
+        with self._lock:
+            by_prompter = {key: dict(entry) for key, entry in self._by_prompter.items()}
+        total = dict.fromkeys(_FIELDS, 0)
+        for entry in by_prompter.values():
+            for field in _FIELDS:
+                total[field] += entry[field]
+        return {"total": total, "by_prompter": by_prompter}
+
+    def reset(self):
+        with self._lock:
+            self._by_prompter.clear()
@@ -1,26 +1,173 @@
-from functools import lru_cache, cached_property
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from abc import ABCMeta, abstractmethod
+from typing import Any, Dict, Optional
 
 
-class PromptCache:
+class CacheBackend(metaclass=ABCMeta):
+    """
+    Abstract base class for prompt cache backends.
+    """
 
-    def __init__(self, cache_size: int = 200):
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """
+        Get the cached output for the key, or None if it is not cached.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, key: str, value: Any):
+        """
+        Cache the output for the key.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        """
+        Remove every cached output.
+        """
+        raise NotImplementedError
+
+
+class PromptCache(CacheBackend):
+    """
+    Thread-safe in-memory LRU cache of model outputs.
+
+    Entries are evicted in least-recently-used order once either the number of
+    entries exceeds `cache_size` or the approximate size of the stored outputs
+    exceeds `max_bytes`. Entries older than `ttl` seconds are treated as missing.
+
+    Args:
+        cache_size (int): Maximum number of entries.
+        max_bytes (int): Maximum approximate size of the stored outputs in bytes. None for no limit.
+        ttl (float): Time to live of an entry in seconds. None for no expiry.
+    """
+
+    def __init__(self, cache_size: int = 200, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
         self.cache_size = cache_size
-        self._cache = lru_cache(maxsize=cache_size)(self._raw_cache)()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resident_bytes = 0
+        self._lock = threading.Lock()
+        # key -> (value, size, expires_at)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
 
-    @cached_property
-    def cache(self):
-        return self._cache
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def cache(self) -> Dict[str, Any]:
+        """
+        Snapshot of the cached outputs by key, kept for backward compatibility.
+        Changes to it do not affect the cache, use `add` instead.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: value
+                for key, (value, _, expires_at) in self._cache.items()
+                if expires_at is None or expires_at > now
+            }
 
     def get(self, key):
-        return self.cache.get(key)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
 
     def add(self, key, value):
-        if key not in self.cache:
-            self.cache[key] = value
+        size = approximate_size(value)
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = (value, size, expires_at)
+            self.resident_bytes += size
+            self._evict()
 
     def clear(self):
-        self.cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self.resident_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._cache),
+                "resident_bytes": self.resident_bytes,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._cache.pop(key)
+        self.resident_bytes -= size
+
+    def _evict(self):
+        while self._cache and (
+            len(self._cache) > self.cache_size
+            or (self.max_bytes is not None and self.resident_bytes > self.max_bytes)
+        ):
+            _, (_, size, _) = self._cache.popitem(last=False)
+            self.resident_bytes -= size
+            self.evictions += 1
+
+
+def approximate_size(obj: Any) -> int:
+    """
+    Approximate the memory footprint of a model output in bytes.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in obj)
+    return size
+
 
-    @staticmethod
-    def _raw_cache():
-        return {}
+def make_cache_key(model, prompt: str, output_schema: Dict[str, Any] = None) -> str:
+    """
+    Build a content-addressed cache key from the model name, the endpoint class,
+    the generation parameters, the prompt and the output schema, which switches
+    the model to JSON output.
+    """
+    parameters = {
+        key: value
+        for key, value in model.get_parameters().items()
+        if key != "messages"
+    }
+    content = {
+        "model": model.model_name,
+        "endpoint": type(model).__name__,
+        "parameters": parameters,
+        "prompt": prompt,
+    }
+    if output_schema is not None:
+        # Left out without a schema, so keys of existing caches stay valid.
+        content["output_schema"] = output_schema
+    payload = json.dumps(
+        content,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -1,27 +1,87 @@
 import os
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, Set
 from pathlib import Path
 
 from jinja2 import Template, Environment, FileSystemLoader, meta
 
+from ollama_prompter.metrics.tracing import tracer
+from ollama_prompter.prompter.template_cache import template_cache
+
 
 class Prompter(object):
+    """
+    Renders prompts from a Jinja2 template.
+
+    Args:
+        template_name (str): File name of the template.
+        template_dir (str): Directory of the template.
+        name (str): Name of the prompter's output in a pipeline. Templates of other
+            prompters using a variable of this name depend on this prompter and
+            receive its parsed output.
+        depends_on (List[str]): Names of prompters to run before this one, on top
+            of those referenced by the template.
+        output_schema (dict): JSON schema of the output, whose top level is an object.
+            When given, the schema is appended to the prompt, the model is asked for
+            JSON output and outputs are validated against it.
+    """
 
-    def __init__(self, template_name: str, template_dir: str) -> None:
+    def __init__(
+        self, 
+        template_name: str, 
+        template_dir: str, 
+        name: Optional[str] = None, 
+        depends_on: Optional[List[str]] = None, 
+        output_schema: Optional[Dict[str, Any]] = None, 
+    ) -> None:
         self.template_name = template_name
         self.template_dir = template_dir
+        self.name = name
+        self.depends_on = list(depends_on or [])
+        if output_schema is not None and output_schema.get("type") != "object":
+            # JSON mode of the models only produces objects.
+            raise ValueError("The output schema must describe an object at the top level.")
+        self.output_schema = output_schema
 
     def generate(self, text: str, **kwargs) -> str:
         """
         Generates a prompt based on a template and input variables.
         """
-        kwargs['text'] = text.strip()
-        template_content = read_template(self.template_name, self.template_dir)
-        environment = Environment(loader=FileSystemLoader(self.template_dir))
-        template = environment.get_template(self.template_name)
-        prompt = template.render(**kwargs)
+        prompt = self.render(text, **kwargs)
+        if self.output_schema is not None:
+            prompt += schema_instruction(self.output_schema)
         return prompt
 
+    def render(self, text: str, **kwargs) -> str:
+        """
+        Renders the template with the input variables, without the output schema.
+        """
+        kwargs['text'] = text.strip()
+        with tracer.span("render", template=self.template_name):
+            template = template_cache.get_template(self.template_name, self.template_dir)
+            return template.render(**kwargs)
+
+    def static_prefix(self, **kwargs) -> str:
+        """
+        Beginning of the prompt that does not depend on the input text, e.g. the
+        instructions of the template rendered with the given variables.
+        """
+        marker = "\x00text\x00"
+        return self.generate(marker, **kwargs).split(marker, 1)[0]
+
+    def variables(self) -> Set[str]:
+        """
+        Names of the variables used by the template.
+        """
+        source = read_template(self.template_name, self.template_dir)
+        return meta.find_undeclared_variables(Environment().parse(source))
+
+
+def schema_instruction(output_schema: Dict[str, Any]) -> str:
+    """Instruction appended to a prompt asking for output matching the schema"""
+
+    return "\nRespond only with a JSON object matching this JSON schema:\n" + json.dumps(output_schema)
+
 
 def read_template(template_name: str, template_dir: str) -> str:
     """Read a template"""
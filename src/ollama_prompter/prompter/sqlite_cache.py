@@ -0,0 +1,99 @@
+import zlib
+import json
+import sqlite3
+import threading
+from typing import Any
+
+from ollama_prompter.prompter.prompt_cache import CacheBackend
+
+
+# Types that may appear in a model output, e.g. under parsed["object_type"].
+_TYPES = {t.__name__: t for t in (dict, list, tuple, set, str, int, float, bool, type(None))}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, type) and _TYPES.get(value.__name__) is value:
+        return {"__type__": value.__name__}
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict) -> Any:
+    if len(obj) == 1 and "__type__" in obj:
+        return _TYPES[obj["__type__"]]
+    return obj
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Persistent prompt cache stored in an SQLite database.
+
+    The database runs in WAL mode, so many processes on one host can read and
+    write the same file concurrently. Outputs are stored as zlib-compressed
+    JSON, so reading a shared cache file never runs code; outputs that cannot
+    be serialized to JSON, such as raw API responses, are not stored. Each
+    thread gets its own connection.
+
+    Args:
+        path (str): Path of the database file.
+        compression_level (int): zlib compression level of the stored outputs.
+        timeout (float): Seconds to wait for a lock held by another process.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6, timeout: float = 30.0):
+        self.path = path
+        self.compression_level = compression_level
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any:
+        row = self._connection().execute(
+            "SELECT value FROM prompt_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(row[0]), object_hook=_decode)
+        except (zlib.error, ValueError, KeyError):
+            # Written by an older version or corrupted, served as a miss and overwritten.
+            return None
+
+    def add(self, key: str, value: Any):
+        try:
+            payload = json.dumps(value, default=_encode)
+        except (TypeError, ValueError):
+            return
+        blob = zlib.compress(payload.encode("utf-8"), self.compression_level)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO prompt_cache (key, value) VALUES (?, ?)",
+                (key, blob),
+            )
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM prompt_cache")
+
+    def close(self):
+        """
+        Close the connection of the calling thread.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,104 @@
+import os
+import time
+import threading
+from typing import Dict, Tuple
+
+from jinja2 import Template, Environment, FileSystemLoader
+
+
+class TemplateCache:
+    """
+    Process-wide registry of compiled Jinja2 templates.
+
+    Templates are keyed by ``(template_dir, template_name)`` and recompiled
+    only when the modification time of the template file changes. To keep the
+    steady state free of filesystem calls, the mtime is checked at most once
+    every ``check_interval`` seconds per template.
+
+    Args:
+        check_interval (float): Minimum number of seconds between two mtime
+            checks of the same template. Set to 0 to check on every lookup.
+    """
+
+    def __init__(self, check_interval: float = 1.0) -> None:
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._environments: Dict[str, Environment] = {}
+        # (template_dir, template_name) -> [template, mtime, last_checked]
+        self._templates: Dict[Tuple[str, str], list] = {}
+
+    def get_template(self, template_name: str, template_dir: str) -> Template:
+        """
+        Return the compiled template, compiling it on first use or after the
+        file has been modified.
+        """
+        template_dir = os.path.abspath(template_dir)
+        key = (template_dir, template_name)
+        now = time.monotonic()
+
+        entry = self._templates.get(key)
+        if entry is not None and now - entry[2] < self.check_interval:
+            with self._lock:
+                self.hits += 1
+            return entry[0]
+
+        path = os.path.join(template_dir, template_name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            raise ValueError(f"{path} is not a valid template.")
+
+        with self._lock:
+            entry = self._templates.get(key)
+            if entry is not None and entry[1] == mtime:
+                entry[2] = now
+                self.hits += 1
+                return entry[0]
+
+            template = self._get_environment(template_dir).get_template(template_name)
+            self._templates[key] = [template, mtime, now]
+            self.misses += 1
+            return template
+
+    def _get_environment(self, template_dir: str) -> Environment:
+        environment = self._environments.get(template_dir)
+        if environment is None:
+            # The registry owns compiled templates, so Jinja's own cache is disabled
+            # to make sure a changed file is actually recompiled.
+            environment = Environment(
+                loader=FileSystemLoader(template_dir), cache_size=0
+            )
+            self._environments[template_dir] = environment
+        return environment
+
+    def invalidate(self, template_name: str = None, template_dir: str = None) -> None:
+        """
+        Drop cached templates. Without arguments the whole registry is cleared.
+        """
+        with self._lock:
+            if template_name is None and template_dir is None:
+                self._templates.clear()
+                return
+            if template_dir is not None:
+                template_dir = os.path.abspath(template_dir)
+            for key in list(self._templates):
+                if template_dir is not None and key[0] != template_dir:
+                    continue
+                if template_name is not None and key[1] != template_name:
+                    continue
+                del self._templates[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._templates),
+        }
+
+
+template_cache = TemplateCache()
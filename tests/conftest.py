@@ -0,0 +1,69 @@
+import os
+import sys
+from typing import Any, Dict, List
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Run against the source tree, and share the benchmark corpus with the tests.
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from ollama_prompter.models.api.base_model import BaseModel, make_usage  # noqa: E402
+
+
+class FakeModel(BaseModel):
+    """
+    Model answering every prompt with `reply(prompt)`, recording the prompts it was sent.
+    """
+    name = "Fake"
+
+    def __init__(self, reply=lambda prompt: "{}", model_name: str = "fake-model") -> None:
+        self.reply = reply
+        self.prompts: List[str] = []
+        super().__init__(None, model_name, api_await=0, api_retry=1, verify="off")
+
+    def _verify_model(self):
+        pass
+
+    def set_key(self, api_key: str):
+        pass
+
+    def supported_models(self) -> List[str]:
+        return [self.model_name]
+
+    def set_model_name(self, model_name: str):
+        self.model_name = model_name
+
+    def get_description(self) -> str:
+        return self.description
+
+    def get_endpoint(self) -> str:
+        return "fake://"
+
+    def get_parameters(self) -> Dict[str, str]:
+        return {}
+
+    def run(self, prompt: str, output_schema: Dict[str, Any] = None) -> Dict[str, Any]:
+        self.prompts.append(prompt)
+        return {"text": self.reply(prompt), "usage": make_usage(len(prompt), 1)}
+
+    async def arun(self, prompt: str, output_schema: Dict[str, Any] = None) -> Dict[str, Any]:
+        return self.run(prompt, output_schema=output_schema)
+
+    def model_output_raw(self, response: Dict[str, Any]) -> Dict:
+        return {"text": response["text"], "usage": self.usage(response)}
+
+    def model_output(self, response: Dict[str, Any], json_depth_limit: int, output_schema: Dict[str, Any] = None) -> Dict:
+        data = self.model_output_from_text(response["text"], json_depth_limit, output_schema)
+        data["usage"] = self.usage(response)
+        return data
+
+    def usage(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        return response["usage"]
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "task.jinja").write_text("Classify: {{ text }}")
+    return str(tmp_path)
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from conftest import FakeModel
+from ollama_prompter.prompter.prompt_cache import PromptCache, make_cache_key
+from ollama_prompter.prompter.sqlite_cache import SQLiteCache
+
+
+def test_lru_eviction():
+    cache = PromptCache(cache_size=2)
+    cache.add("a", 1)
+    cache.add("b", 2)
+    assert cache.get("a") == 1
+    cache.add("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_max_bytes_eviction():
+    cache = PromptCache(cache_size=100, max_bytes=2000)
+    for i in range(10):
+        cache.add(str(i), "x" * 500)
+    assert cache.resident_bytes <= 2000
+    assert cache.get("9") is not None
+    assert cache.get("0") is None
+
+
+def test_ttl_expiry():
+    cache = PromptCache(ttl=0.01)
+    cache.add("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_property_is_a_snapshot():
+    cache = PromptCache()
+    cache.add("a", {"text": "x"})
+    snapshot = cache.cache
+    assert snapshot == {"a": {"text": "x"}}
+    snapshot["b"] = 1
+    assert cache.get("b") is None
+
+
+def test_stats_count_hits_and_misses():
+    cache = PromptCache()
+    cache.add("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_cache_key_depends_on_model_and_schema():
+    prompt = "Classify: x"
+    key = make_cache_key(FakeModel(), prompt)
+    assert key == make_cache_key(FakeModel(), prompt)
+    assert key != make_cache_key(FakeModel(model_name="other"), prompt)
+    assert key != make_cache_key(FakeModel(), prompt, {"type": "object"})
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_sqlite_round_trip(sqlite_cache, tmp_path):
+    output = {
+        "text": '{"a": 1}',
+        "parsed": {"status": "completed", "object_type": dict, "data": {"completion": {"a": 1}, "suggestions": []}},
+    }
+    sqlite_cache.add("key", output)
+    assert sqlite_cache.get("key") == output
+    # Shared with another process through the file.
+    other = SQLiteCache(str(tmp_path / "cache.db"))
+    assert other.get("key") == output
+    other.close()
+
+
+def test_sqlite_replaces_and_clears(sqlite_cache):
+    sqlite_cache.add("key", {"text": "a"})
+    sqlite_cache.add("key", {"text": "b"})
+    assert sqlite_cache.get("key") == {"text": "b"}
+    sqlite_cache.clear()
+    assert sqlite_cache.get("key") is None
+
+
+def test_sqlite_skips_unserializable_values(sqlite_cache):
+    sqlite_cache.add("key", {"raw": object()})
+    assert sqlite_cache.get("key") is None
+
+
+def test_sqlite_does_not_unpickle(sqlite_cache):
+    import pickle
+    import zlib
+
+    with sqlite_cache._connection() as conn:
+        conn.execute(
+            "INSERT INTO prompt_cache (key, value) VALUES (?, ?)",
+            ("key", zlib.compress(pickle.dumps({"text": "a"}))),
+        )
+    assert sqlite_cache.get("key") is None
@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+from ollama_prompter.models.api.load_balancer import LoadBalancer, is_endpoint_failure
+
+
+class StatusError(Exception):
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def make_balancer(healthy=lambda state: None, **kwargs):
+    return LoadBalancer(["http://a", "http://b"], client_factory=lambda endpoint: endpoint, health_check=healthy, **kwargs)
+
+
+def fail(balancer, error):
+    with pytest.raises(type(error)):
+        with balancer.route():
+            raise error
+
+
+def test_least_outstanding_spreads_requests():
+    balancer = make_balancer()
+    first = balancer.acquire()
+    second = balancer.acquire()
+    assert first is not second
+    balancer.release(first, 0.01)
+    balancer.release(second, 0.01)
+    assert [state.outstanding for state in balancer.endpoints] == [0, 0]
+
+
+def test_is_endpoint_failure():
+    assert is_endpoint_failure(httpx.ConnectError("down"))
+    assert is_endpoint_failure(TimeoutError())
+    assert is_endpoint_failure(StatusError(502))
+    assert not is_endpoint_failure(StatusError(400))
+    assert not is_endpoint_failure(ValueError())
+
+
+def test_connection_errors_eject_the_endpoint():
+    balancer = make_balancer(failure_threshold=2)
+    for _ in range(4):
+        fail(balancer, httpx.ConnectError("down"))
+    assert not any(state.healthy for state in balancer.endpoints)
+    # Every endpoint is ejected, traffic still goes through.
+    with balancer.route() as state:
+        assert state in balancer.endpoints
+
+
+def test_client_errors_do_not_eject():
+    balancer = make_balancer(failure_threshold=1)
+    for _ in range(4):
+        fail(balancer, StatusError(400))
+    assert all(state.healthy for state in balancer.endpoints)
+    assert sum(state.errors for state in balancer.endpoints) == 4
+
+
+def test_health_check_readmits():
+    down = set()
+
+    def health_check(state):
+        if state.endpoint in down:
+            raise httpx.ConnectError("down")
+
+    balancer = make_balancer(health_check, failure_threshold=1)
+    balancer.endpoints[0].healthy = False
+    down.add("http://b")
+    balancer.check_health()
+    assert balancer.endpoints[0].healthy
+    assert not balancer.endpoints[1].healthy
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        LoadBalancer([], client_factory=str, health_check=lambda state: None)
+    with pytest.raises(ValueError):
+        make_balancer(strategy="random")
+    with pytest.raises(ValueError):
+        make_balancer(weights=[1.0])
@@ -0,0 +1,71 @@
+import json
+
+from conftest import FakeModel
+from ollama_prompter.models.api.base_model import make_usage
+from ollama_prompter.pipeline.packing import PromptPacker
+from ollama_prompter.prompter.prompter import Prompter
+
+SCHEMA = {"type": "object", "properties": {"label": {"enum": ["a", "b"]}}, "required": ["label"]}
+
+
+def reply(completion):
+    return {"parsed": {"status": "completed", "data": {"completion": completion}}, "usage": make_usage(10, 5)}
+
+
+def test_pack_numbers_the_texts(template_dir):
+    prompter = Prompter("task.jinja", template_dir, output_schema=SCHEMA)
+    prompt = PromptPacker().pack(prompter, ["first", " second "], {})
+    assert prompt.startswith("Classify: [1] first\n\n[2] second")
+    assert "[1] to [2]" in prompt
+    assert json.dumps(PromptPacker.output_schema(prompter)) in prompt
+
+
+def test_batches_respect_max_items_and_budget(template_dir):
+    prompter = Prompter("task.jinja", template_dir)
+    texts = dict(enumerate(["x" * 40] * 5))
+    assert PromptPacker(max_items=2).batches(prompter, texts, {}) == [[0, 1], [2, 3], [4]]
+    packer = PromptPacker(max_items=8, count_tokens=len)
+    static = len(packer.pack(prompter, [], {}))
+    batches = packer.batches(prompter, texts, {})
+    assert len(batches) == 1
+    packer.token_budget = static + 100
+    assert packer.batches(prompter, texts, {}) == [[0, 1], [2, 3], [4]]
+
+
+def test_unpack_keeps_valid_slots(template_dir):
+    prompter = Prompter("task.jinja", template_dir, output_schema=SCHEMA)
+    slots = PromptPacker().unpack(
+        reply({"1": {"label": "a"}, "[2]": {"label": "c"}, "3": "garbage", "4": {"label": "b"}}), 3, prompter
+    )
+    assert list(slots) == [1]
+    assert slots[1]["parsed"]["data"]["completion"] == {"label": "a"}
+    # Tokens are counted on the pack, not on each slot.
+    assert slots[1]["usage"]["prompt_tokens"] is None
+
+
+def test_unpack_accepts_empty_slots_without_schema(template_dir):
+    prompter = Prompter("task.jinja", template_dir)
+    slots = PromptPacker().unpack(reply({"1": [], "2": {}}), 2, prompter)
+    assert [slots[number]["parsed"]["data"]["completion"] for number in (1, 2)] == [[], {}]
+
+
+def test_fit_packed_resubmits_failed_slots(template_dir, monkeypatch, tmp_path):
+    from ollama_prompter.pipeline.pipeline import Pipeline
+
+    monkeypatch.chdir(tmp_path)
+
+    def answer(prompt):
+        if "[3]" in prompt:
+            # Slot 2 does not follow the schema, slot 3 is missing.
+            return '{"1": {"label": "a"}, "2": {"label": "c"}}'
+        return '{"1": {"label": "b"}, "2": {"label": "b"}}'
+
+    model = FakeModel(answer)
+    prompter = Prompter("task.jinja", template_dir, output_schema=SCHEMA)
+    pipeline = Pipeline([prompter], model, cache_prompt=False)
+    results = pipeline.fit_packed(["one", "two", "three"], max_items=3, max_rounds=2)
+    labels = [result[0]["parsed"]["data"]["completion"]["label"] for result in results]
+    assert labels == ["a", "b", "b"]
+    # The first pack, then one pack with the two failed slots.
+    assert len(model.prompts) == 2
+    assert "one" not in model.prompts[1]
@@ -0,0 +1,63 @@
+import pytest
+
+from corpus import REGRESSION_CASES
+from ollama_prompter.parser import IncrementalParser, Parser
+from ollama_prompter.parser.repair import JsonRepairEngine
+from ollama_prompter.parser.schema import validate_schema
+
+
+@pytest.mark.parametrize("text, expected", REGRESSION_CASES)
+def test_regression_cases(text, expected):
+    parsed = Parser(engine="stack").fit(text, 20)
+    assert parsed["status"] == "completed"
+    assert parsed["data"]["completion"] == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1, 2]}),
+    ('[{"a": 1}, {"b": 2', [{"a": 1}, {"b": 2}]),
+    ('{"a": {"b": {"c": 1', {"a": {"b": {"c": 1}}}),
+    ('{"a": "x\\', {"a": "x"}),
+    ('{"a": 1, "b', {"a": 1}),
+])
+def test_repairs_truncated_json(text, expected):
+    assert JsonRepairEngine().repair(text)["completion"] == expected
+
+
+def test_complete_input_is_returned_as_is():
+    parsed = Parser().fit('{"a": [1, 2]}')
+    assert parsed["data"] == {"completion": {"a": [1, 2]}, "suggestions": []}
+
+
+def test_max_suggestions_ranks_alternatives():
+    suggestions = JsonRepairEngine(max_suggestions=3).repair('{"a": [1, {"b": 2')["suggestions"]
+    assert suggestions[0] == {"a": [1, {"b": 2}]}
+    assert len(suggestions) > 1
+
+
+def test_unrepairable_input_fails():
+    assert Parser().fit("no json here")["status"] == "failed"
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        Parser(engine="magic")
+
+
+def test_validate_schema():
+    schema = {
+        "type": "object",
+        "properties": {"label": {"enum": ["a", "b"]}, "score": {"type": "number"}},
+        "required": ["label"],
+    }
+    assert validate_schema({"label": "a", "score": 0.5}, schema) == []
+    assert validate_schema({"label": "c"}, schema)
+    assert validate_schema({"score": 1}, schema)
+
+
+def test_incremental_parser_emits_list_elements():
+    parser = IncrementalParser()
+    assert parser.feed("Sure: [{'T': 'ORG', 'E': 'FBI'}, {'T': 'LO") == [{"T": "ORG", "E": "FBI"}]
+    assert not parser.closed
+    assert parser.feed("C', 'E': 'Iraq'}] trailing") == [{"T": "LOC", "E": "Iraq"}]
+    assert parser.closed
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from conftest import FakeModel
+from ollama_prompter.pipeline.graph import PromptGraph
+from ollama_prompter.pipeline.pipeline import Pipeline
+from ollama_prompter.pipeline.single_flight import SingleFlight
+from ollama_prompter.pipeline.usage import UsageStats
+from ollama_prompter.prompter.prompter import Prompter
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def completions(outputs):
+    return [output["parsed"]["data"]["completion"] for output in outputs]
+
+
+def test_usage_stats():
+    usage = UsageStats()
+    usage.add("a", {"prompt_tokens": 10, "completion_tokens": 2})
+    usage.add("a", {"prompt_tokens": 10, "completion_tokens": 2, "cached": True})
+    usage.add("b", None)
+    summary = usage.summary()
+    assert summary["by_prompter"]["a"]["saved_prompt_tokens"] == 10
+    assert summary["total"]["requests"] == 3
+    assert summary["total"]["model_calls"] == 2
+    assert summary["total"]["prompt_tokens"] == 10
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def func():
+        calls.append(1)
+        release.wait(1)
+        return "done"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", func))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["done"] * 4
+    assert len(calls) == 1
+    assert len(flight) == 0
+
+
+def test_graph_orders_dependencies(template_dir, tmp_path):
+    (tmp_path / "summary.jinja").write_text("Summarize {{ text }} as {{ topic }}")
+    topic = Prompter("task.jinja", template_dir, name="topic")
+    summary = Prompter("summary.jinja", str(tmp_path), name="summary")
+    graph = PromptGraph([summary, topic])
+    assert graph.dependencies == [{1}, set()]
+    assert graph.order == [1, 0]
+    with pytest.raises(ValueError):
+        PromptGraph([Prompter("task.jinja", template_dir, name="a", depends_on=["b"])])
+
+
+def test_fit_feeds_upstream_outputs(template_dir, tmp_path):
+    (tmp_path / "summary.jinja").write_text("Summarize {{ text }} as {{ topic }}")
+    model = FakeModel(lambda prompt: "{'topic': 'sports'}" if prompt.startswith("Classify") else "{'ok': 1}")
+    pipeline = Pipeline(
+        [Prompter("summary.jinja", str(tmp_path), name="summary"), Prompter("task.jinja", template_dir, name="topic")],
+        model,
+    )
+    outputs = pipeline.fit("match")
+    assert completions(outputs) == [{"ok": 1}, {"topic": "sports"}]
+    assert "{'topic': 'sports'}" in model.prompts[1]
+
+
+def test_prompt_cache_and_usage(template_dir):
+    model = FakeModel(lambda prompt: "{'label': 'a'}")
+    pipeline = Pipeline([Prompter("task.jinja", template_dir)], model)
+    pipeline.fit("x")
+    pipeline.fit("x")
+    assert len(model.prompts) == 1
+    total = pipeline.usage_summary()["total"]
+    assert (total["requests"], total["model_calls"], total["cached"]) == (2, 1, 1)
+    assert pipeline.usage_summary(last_run=True)["total"]["cached"] == 1
+
+
+def test_prompters_run_sequentially_by_default(template_dir):
+    active, peak = [], []
+
+    def reply(prompt):
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.02)
+        active.pop()
+        return "{}"
+
+    prompters = [Prompter("task.jinja", template_dir, name=name) for name in ("a", "b", "c")]
+    Pipeline(prompters, FakeModel(reply), cache_prompt=False).fit("x")
+    assert max(peak) == 1
+    peak.clear()
+    Pipeline(prompters, FakeModel(reply), cache_prompt=False, prompter_workers=3).fit("x")
+    assert max(peak) > 1
+
+
+def test_last_run_usage_is_per_thread(template_dir):
+    pipeline = Pipeline([Prompter("task.jinja", template_dir)], FakeModel(), cache_prompt=False)
+    usages = {}
+
+    def run(n):
+        for i in range(n):
+            pipeline.fit(str(i))
+        usages[n] = pipeline.usage_summary(last_run=True)["total"]["requests"]
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in (1, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert usages == {1: 1, 3: 1}
+    assert pipeline.usage_summary()["total"]["requests"] == 4
+
+
+def test_amap_usage_covers_the_whole_run(template_dir):
+    pipeline = Pipeline([Prompter("task.jinja", template_dir)], FakeModel(), cache_prompt=False)
+    outputs = asyncio.run(pipeline.amap(["a", "b", "c"]))
+    assert len(outputs) == 3
+    assert pipeline.usage_summary(last_run=True)["total"]["requests"] == 3
+
+
+def test_fit_many_reports_errors(template_dir):
+    def reply(prompt):
+        if "bad" in prompt:
+            raise ValueError("rejected")
+        return "{}"
+
+    pipeline = Pipeline([Prompter("task.jinja", template_dir)], FakeModel(reply), cache_prompt=False)
+    results = list(pipeline.fit_many(["good", "bad", {"text": "fine"}], workers=2))
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[1]["output"] is None and isinstance(results[1]["error"], ValueError)
+    assert results[2]["error"] is None
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from ollama_prompter.prompter.prompter import Prompter
+from ollama_prompter.prompter.template_cache import TemplateCache
+
+
+def test_template_cache_compiles_once(template_dir):
+    cache = TemplateCache()
+    first = cache.get_template("task.jinja", template_dir)
+    assert cache.get_template("task.jinja", template_dir) is first
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_template_cache_recompiles_modified_file(template_dir):
+    cache = TemplateCache(check_interval=0)
+    path = os.path.join(template_dir, "task.jinja")
+    assert cache.get_template("task.jinja", template_dir).render(text="x") == "Classify: x"
+    with open(path, "w") as f:
+        f.write("Summarize: {{ text }}")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.get_template("task.jinja", template_dir).render(text="x") == "Summarize: x"
+
+
+def test_template_cache_invalidate(template_dir):
+    cache = TemplateCache()
+    cache.get_template("task.jinja", template_dir)
+    cache.invalidate(template_dir=template_dir)
+    assert cache.stats()["size"] == 0
+
+
+def test_missing_template(template_dir):
+    with pytest.raises(ValueError):
+        TemplateCache().get_template("missing.jinja", template_dir)
+
+
+def test_generate_appends_schema(template_dir):
+    schema = {"type": "object", "properties": {"label": {"type": "string"}}}
+    prompter = Prompter("task.jinja", template_dir, output_schema=schema)
+    prompt = prompter.generate("  some text ")
+    assert prompt.startswith("Classify: some text")
+    assert '"label"' in prompt
+    assert prompter.render("some text") == "Classify: some text"
+
+
+def test_non_object_schema_is_rejected(template_dir):
+    with pytest.raises(ValueError):
+        Prompter("task.jinja", template_dir, output_schema={"type": "array"})
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+from ollama_prompter.models.api.rate_limiter import RateLimiter, TokenBucket, parse_duration
+
+
+def test_parse_duration():
+    assert parse_duration("1s") == 1.0
+    assert parse_duration("6m0s") == 360.0
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("2.5") == 2.5
+    assert parse_duration("soon") is None
+    assert parse_duration(None) is None
+
+
+def test_bucket_waits_for_the_deficit():
+    bucket = TokenBucket(60)
+    now = bucket.updated_at
+    assert bucket.reserve(60, now) == (0.0, 60)
+    wait, taken = bucket.reserve(2, now)
+    assert taken == 2
+    assert abs(wait - 2.0) < 1e-6
+
+
+def test_reservation_is_capped_at_capacity():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    assert limiter.acquire(5000) == 1000
+    limiter.settle(1000, 0)
+    assert limiter.tokens.level == 1000
+
+
+def test_settle_charges_the_actual_usage():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    reserved = limiter.acquire(300)
+    limiter.settle(reserved, 100)
+    assert 899 < limiter.tokens.level <= 900.1
+
+
+def test_request_budget_blocks():
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.requests.level = 0
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_async_acquire():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=100)
+    assert asyncio.run(limiter.aacquire(10)) == 10
+
+
+def test_headers_pause_and_tighten():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000)
+    limiter.update_from_headers({"retry-after-ms": "50", "x-ratelimit-remaining-tokens": "10"})
+    assert limiter._paused_until > time.monotonic()
+    assert limiter.tokens.level <= 10.1
+
+
+def test_malformed_headers_are_ignored():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    limiter.update_from_headers({"retry-after-ms": "soon", "retry-after": "inf", "x-ratelimit-remaining-tokens": "?"})
+    assert limiter._paused_until == 0.0
+    assert limiter.tokens.level == 1000
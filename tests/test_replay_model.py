@@ -0,0 +1,82 @@
+import pickle
+import zlib
+
+import pytest
+
+from conftest import FakeModel
+from ollama_prompter.models.api.replay_model import _RECORD_HEADER, ReplayModel
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    return str(tmp_path / "cassette.bin")
+
+
+def record(cassette, prompts):
+    model = FakeModel(lambda prompt: "reply to " + prompt)
+    recorder = ReplayModel(cassette, model, mode="record")
+    for prompt in prompts:
+        recorder.run(prompt)
+    recorder.close()
+    return model
+
+
+def test_replays_recorded_prompts(cassette):
+    record(cassette, ["a", "b"])
+    replay = ReplayModel(cassette, model_name="fake-model")
+    response = replay.run("b")
+    assert response["text"] == "reply to b"
+    assert response["usage"]["cached"]
+    with pytest.raises(KeyError):
+        replay.run("c")
+    replay.close()
+
+
+def test_records_are_keyed_by_model_name(cassette):
+    record(cassette, ["a"])
+    replay = ReplayModel(cassette, model_name="other-model")
+    with pytest.raises(KeyError):
+        replay.run("a")
+    replay.close()
+
+
+def test_auto_mode_records_misses(cassette):
+    model = record(cassette, ["a"])
+    auto = ReplayModel(cassette, model, mode="auto")
+    assert auto.run("a")["text"] == "reply to a"
+    assert auto.run("b")["text"] == "reply to b"
+    # Served before the index is rebuilt.
+    assert auto.run("b")["usage"]["cached"]
+    auto.close()
+    assert model.prompts == ["a", "b"]
+
+
+def test_index_is_rebuilt_when_stale(cassette):
+    record(cassette, ["a"])
+    model = FakeModel(lambda prompt: "reply to " + prompt)
+    recorder = ReplayModel(cassette, model, mode="record")
+    recorder.run("b")
+    # Not closed, the index does not cover "b".
+    replay = ReplayModel(cassette, model_name="fake-model")
+    assert replay.run("b")["text"] == "reply to b"
+    replay.close()
+    recorder.close()
+
+
+def test_model_name_is_required_without_a_model(cassette):
+    with pytest.raises(ValueError):
+        ReplayModel(cassette)
+    with pytest.raises(ValueError):
+        ReplayModel(cassette, mode="record", model_name="fake-model")
+
+
+def test_pickled_records_are_rejected(cassette):
+    replay = ReplayModel(cassette, model_name="fake-model")
+    digest = replay._digest("a")
+    payload = zlib.compress(pickle.dumps({"model_name": "fake-model", "prompt": "a", "text": "x"}))
+    with open(cassette, "ab") as f:
+        f.write(_RECORD_HEADER.pack(digest, len(payload)) + payload)
+    replay.build_index()
+    with pytest.raises(ValueError):
+        replay.run("a")
+    replay.close()
@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ollama_prompter.models.api.retry_policy import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+
+
+class StatusError(Exception):
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def flaky(failures):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+
+    return func, calls
+
+
+def test_retries_transient_errors():
+    func, calls = flaky([StatusError(503), httpx.ConnectError("down")])
+    assert RetryPolicy(max_attempts=3, max_wait=0).call(func) == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("error", [StatusError(400), ValueError("unsupported model")])
+def test_fatal_errors_are_not_retried(error):
+    func, calls = flaky([error])
+    with pytest.raises(type(error)):
+        RetryPolicy(max_attempts=3, max_wait=0).call(func)
+    assert len(calls) == 1
+
+
+def test_is_retryable():
+    policy = RetryPolicy()
+    assert policy.is_retryable(StatusError(429))
+    assert policy.is_retryable(StatusError(500))
+    assert not policy.is_retryable(StatusError(404))
+    assert not policy.is_retryable(KeyboardInterrupt())
+
+
+def test_budget_limits_retries():
+    budget = RetryBudget(ratio=0, min_retries=1)
+    func, calls = flaky([StatusError(503)] * 3)
+    with pytest.raises(StatusError):
+        RetryPolicy(max_attempts=5, max_wait=0, budget=budget).call(func)
+    assert len(calls) == 2
+
+
+def test_breaker_opens_and_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    policy = RetryPolicy(max_attempts=1, breaker=breaker)
+    func, calls = flaky([StatusError(503)] * 2)
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            policy.call(func)
+    with pytest.raises(CircuitOpenError):
+        policy.call(func)
+    assert len(calls) == 2
+
+    breaker._opened_at -= 0.05
+    assert policy.call(func) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_errors_do_not_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1)
+    func, _ = flaky([StatusError(400)])
+    with pytest.raises(StatusError):
+        RetryPolicy(max_attempts=1, breaker=breaker).call(func)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_call():
+    attempts = []
+
+    async def func():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise StatusError(502)
+        return "ok"
+
+    assert asyncio.run(RetryPolicy(max_attempts=2, max_wait=0).acall(func)) == "ok"